@@ -1,32 +1,84 @@
 import streamlit as st
 import re
 import pandas as pd
-import json
-import pytesseract
-from PIL import Image, ImageOps, ImageEnhance
 import numpy as np
+from diagnosis import DiagnosisState
+from requirements_model import RequirementsCatalog, RequirementsError, load_catalog
+import os
+import uuid
+import ocr_pipeline
+from ocr_scheduler import SchedulerBusy, get_scheduler
+from metrics import metrics
+from capture_dedup import plan_uploads
+import pdf_transcript
+from session_store import CourseTable, estimate_size, session_store
+from assets import ASSET_FORMATS, GUIDE_WIDTH, MIME_TYPES, RETINA_SCALE, get_asset_cache
 
 st.set_page_config(page_title="연세대학교 졸업예비진단", page_icon="🎓", layout="wide")
 
 # --- 세션 상태 초기화 ---
-if 'ocr_results' not in st.session_state:
-    st.session_state.ocr_results = []
+# 강의 목록은 열 단위 CourseTable로만 보관하고, 진단 상태처럼 다시 계산할 수 있는 것은 session_store(전역 메모리 예산)에 둡니다.
+if 'courses' not in st.session_state:
+    st.session_state.courses = CourseTable()
+if 'session_key' not in st.session_state:
+    st.session_state.session_key = uuid.uuid4().hex
+if 'uploader_gen' not in st.session_state:
+    st.session_state.uploader_gen = 0  # 분석이 끝나면 올라가서 업로더(업로드된 이미지)를 비움
+if 'classified_for' not in st.session_state:
+    st.session_state.classified_for = None  # 강의 목록의 이수구분을 자동 분류한 (년도, 버전, 전공)
+session_store.touch(st.session_state.session_key)
 
 # --- 1. 졸업요건 DB 로드 ---
-@st.cache_data
-def load_requirements():
-    try:
-        with open('requirements.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError: return {}
-
-db = load_requirements()
+# 프로세스당 한 번 컴파일(정규화/매칭 인덱스 포함)하고, requirements.json이 수정되면 자동으로 다시 읽습니다.
+try:
+    catalog = load_catalog('requirements.json')
+    catalog_error = None
+except (RequirementsError, ValueError) as e:
+    catalog, catalog_error = RequirementsCatalog({}), e
 
 # --- 2. 헬퍼 함수 ---
 
-def normalize_string(s):
-    if not isinstance(s, str): return ""
-    return re.sub(r'[^가-힣a-zA-Z0-9]', '', s).upper()
+# 가이드 이미지는 프로세스당 한 번 표시 폭으로 미리 줄여 두고(원본 mtime 기준) 바이트 그대로 내보냅니다.
+# Streamlit 정적 파일 서빙(server.enableStaticServing)이 켜져 있으면 static/ 아래에 만들어 WebP/레티나(2x)를 srcset으로 제공합니다.
+STATIC_ASSETS = bool(st.get_option("server.enableStaticServing"))
+asset_cache = get_asset_cache("static/guides" if STATIC_ASSETS else ".asset_cache")
+
+def show_guide_image(name, caption):
+    """images/{name}을 미리 렌더링된 변환본으로 표시. 원본이 없으면 False"""
+    png = asset_cache.variant(name, "png")
+    if png is None: return False
+    if STATIC_ASSETS:
+        url = lambda v: "app/static/guides/" + os.path.basename(v.path)
+        fmt = "webp" if "webp" in ASSET_FORMATS else "png"
+        srcset = f"{url(asset_cache.variant(name, fmt))} 1x, {url(asset_cache.variant(name, fmt, RETINA_SCALE))} {RETINA_SCALE}x"
+        st.markdown(f'<picture><source type="{MIME_TYPES[fmt]}" srcset="{srcset}">'
+                    f'<img src="{url(png)}" width="{GUIDE_WIDTH}" alt="{caption}"></picture>', unsafe_allow_html=True)
+        st.caption(caption)
+    else:
+        # 표시 폭과 같은 크기의 PNG 바이트 → Streamlit이 다시 디코딩/리사이즈/재인코딩하지 않음
+        st.image(png.data, caption=caption, width=GUIDE_WIDTH, output_format="PNG")
+    return True
+
+def get_course_index(year, version, dept):
+    """(년도, 버전, 전공)별 강의명 매칭 인덱스 (컴파일된 카탈로그에서 꺼냄)"""
+    return catalog.index_for(year, version, dept)
+
+def get_classifiers(year, version, dept, autocorrect):
+    """(분류 함수, 강의명 교정 함수 또는 None)"""
+    classify = get_course_index(year, version, dept).classify
+    correct = catalog.fuzzy_for(year, version, dept).correct if autocorrect else None
+    return classify, correct
+
+def reclassify_courses(courses, old_classify, new_classify):
+    """이전 기준의 자동 분류와 이수구분이 같은 행(사용자가 고치지 않은 행)만 새 기준으로 다시 분류. (새 테이블, 바뀐 행 수)"""
+    table, changed = CourseTable(), 0
+    for name, credit, ftype in zip(courses.names, courses.credits, courses.types):
+        if name and ftype == old_classify(name):
+            new_type = new_classify(name)
+            changed += new_type != ftype
+            ftype = new_type
+        table.append(name, credit, ftype)
+    return table, changed
 
 # --- 가이드 팝업 함수 정의 ---
 @st.dialog("🔎 에브리타임 캡쳐 가이드")
@@ -34,10 +86,7 @@ def show_capture_guide():
     st.write("인식률을 높이려면 아래 예시와 같이 **과목명과 학점**이 명확히 보이게 캡쳐해 주세요.")
     
     # 가이드 이미지 파일이 있다면 출력 (없을 경우 캡션으로 대체 가능)
-    try:
-        guide_example = Image.open("images/everytime_guide.png")
-        st.image(guide_example, caption="✅ 올바른 예시: 과목명과 학점이 한 줄에 위치")
-    except FileNotFoundError:
+    if not show_guide_image("everytime_guide.png", "✅ 올바른 예시: 과목명과 학점이 한 줄에 위치"):
         st.warning("⚠️ 'images/everytime_guide.png' 파일을 찾을 수 없습니다. 이미지를 준비해 주세요.")
     
     st.info("""
@@ -60,92 +109,42 @@ def show_bug_report_dialog(year, dept):
     st.code("- 오류 현상:\n- 기대 결과:\n- 첨부파일 여부(에타 캡쳐본 등):", language="text")
 
 def classify_course_logic(course_name, year, version, dept):
-    norm_name = normalize_string(course_name)
-
-    # [추가] 교양 영역 자동 매칭 (JSON의 area_courses 기준)
-    area_db = db.get("area_courses", {})
-    for area_name, course_list in area_db.items():
-        # 영역별 강의 리스트를 순회하며 매칭 확인
-        for area_c in course_list:
-            if normalize_string(area_c) in norm_name:
-                return f"교양({area_name})"
-
-    # 1. RC/리더십 예외 처리
-    if "RC" in norm_name or "리더십" in norm_name:
-        return "교양(리더십)"
-
-    try:
-        dept_db = db[year][version][dept]
-    except KeyError:
-        return "교양/기타"
-
-    known = dept_db.get("known_courses", {})
-
-    # [개선] 2. 전공 필수 체크
-    for req in known.get("major_required", []):
-        if normalize_string(req) in norm_name: 
-            return "전공필수"
-
-    # [개선] 3. 전공 선택 체크 (임상실습 키워드 강화)
-    major_sel_list = known.get("major_elective", [])
-    for sel in major_sel_list:
-        if normalize_string(sel) in norm_name: 
-            return "전공선택"
-    
-    # [추가] 4. 특정 키워드 강제 매칭 (보조 장치)
-    if "임상실습" in norm_name or "임상병리사" in norm_name:
-        return "전공선택"
-
-    # 5. 교양 영역 체크 (기존과 동일)
-    # ...
-    return "교양/기타"
-
-def ocr_image_parsing(image_file, year, version, dept):
-    """이미지 전처리 및 OCR 파싱"""
-    try:
-        # 이미지 로드 및 이진화
-        img = Image.open(image_file).convert('L')
-
-        # 이미지 리사이징: 1500px
-        if img.width > 1500:
-            ratio = 1500 / float(img.width)
-            new_height = int(float(img.height) * ratio)
-            img = img.resize((1500, new_height), Image.Resampling.LANCZOS)
-
-        # 이미지 전처리
-        img = ImageEnhance.Sharpness(img).enhance(2.0) #선명도 상향
-        img = ImageOps.autocontrast(img)
-        img = ImageEnhance.Contrast(img).enhance(2.5) #대비 상향
-
-        # OCR 설정 최적화
-        # [최적화] 인식 범위를 화이트리스트로 제한하여 속도 향상
-        custom_config = '--psm 6 --oem 3'
-        text = pytesseract.image_to_string(img, lang='kor+eng', config=custom_config)
-
-        parsed_data = []
-        for line in text.split('\n'):
-            # 패턴: (강의명) (학점) 순서
-            match = re.search(r'^(.*?)\s+(\d+(?:\.\d+)?)(?:\s+.*)?$', line.strip())
-            if match:
-                raw_name = match.group(1).strip()
-                clean_name = re.sub(r'[()\[\]{}]', '', raw_name) # 괄호류 제거
-                clean_name = re.sub(r'\s+', ' ', clean_name).strip() # 연속 공백을 하나로 축소
-                
-                # 노이즈 필터링 (학점 != 0.5*n and 학점 > 5 필터링)
-                try:
-                    credit = float(match.group(2))
-                    if credit != 0: 
-                        if credit % 0.5 != 0 or credit < 0.5 or credit > 5.0 or credit < 0.5:
-                            continue
-                except: continue
-
-                if clean_name != "채플":
-                    if len(clean_name) < 3 or clean_name.isdigit(): continue
-
-                ftype = classify_course_logic(clean_name, year, version, dept)
-                parsed_data.append({"강의명": clean_name, "학점": credit, "이수구분": ftype})
-        return parsed_data
-    except: return []
+    # 우선순위: 교양 영역(area_courses) > RC/리더십 > 전공필수 > 전공선택 > 임상실습 키워드
+    return get_course_index(year, version, dept).classify(course_name)
+
+def explain_course_match(course_name, year, version, dept):
+    """디버깅용: 어떤 패턴/규칙으로 분류되었는지 반환 (CourseMatch)"""
+    return get_course_index(year, version, dept).match(course_name)
+
+def render_metrics_panel():
+    """단계별 소요 시간(p50/p95)과 줄/캐시 카운터 (프로세스 전체 기준)"""
+    with st.expander("📈 처리 시간 계측 (운영자)"):
+        usage = session_store.usage()
+        st.progress(min(usage["used"] / max(usage["budget"], 1), 1.0),
+                    text=f"세션 메모리 {usage['used'] / 1024:,.0f}KB / {usage['budget'] / 1024 / 1024:,.0f}MB "
+                         f"(세션 {usage['sessions']}개, 쉬는 세션 {usage['idle_sessions']}개, 정리 {usage['evictions']}회)")
+        sched = get_scheduler().stats()
+        st.caption(f"OCR 스케줄러: 워커 {sched['workers']}개 중 {sched['running']}개 실행 중, 대기 {sched['pending']}장 "
+                   f"(세션 {sched['sessions']}개), 거절 {sched['rejected']}회, 이미지당 평균 {sched['avg_job_s']}초")
+        if not metrics.enabled:
+            st.caption("계측이 꺼져 있습니다. APP_METRICS=1 로 실행하세요.")
+            return
+        data = metrics.summary()
+        if data["stages"]:
+            stage_df = pd.DataFrame.from_dict(data["stages"], orient="index")[["count", "p50_ms", "p95_ms", "mean_ms", "max_ms"]]
+            st.dataframe(stage_df, use_container_width=True)
+        else:
+            st.caption("아직 측정된 단계가 없습니다.")
+        if data["counters"]:
+            st.json(data["counters"])
+        c1, c2 = st.columns(2)
+        c1.download_button("JSON", metrics.to_json(), file_name="metrics.json", mime="application/json")
+        c2.download_button("Prometheus", metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+        if st.button("파일로 내보내기"):
+            st.caption(f"저장됨: {metrics.export_to_file()}")
+        if st.button("계측 초기화"):
+            metrics.reset()
+            st.rerun()
 
 # --- 3. 사이드바 구성 (최종 교정 버전) ---
 with st.sidebar:
@@ -162,15 +161,15 @@ with st.sidebar:
         
         문의: jaekwang1164@gmail.com
         """)
-    if db:
+    if catalog:
         # 1단계: 년도(학번) 선택 (area_courses 제외한 최상위 키)
-        years_list = sorted([k for k in db.keys() if k != "area_courses"], reverse=False)
+        years_list = catalog.years()
         selected_year = st.selectbox("1️⃣ 입학년도 선택", years_list, key="s_year_final")
         
         # 2단계: 세부 판정 기준 선택 (db[년도]의 하위 키들)
         # 예: ['졸업요건 기준', '진단세포학 임시삭제']
-        if selected_year in db:
-            versions_list = list(db[selected_year].keys())
+        versions_list = catalog.versions(selected_year)
+        if versions_list:
             selected_version = st.selectbox("2️⃣ 세부 판정 기준", versions_list, key="s_version_final")
         else:
             selected_version = None
@@ -178,27 +177,47 @@ with st.sidebar:
         # 3단계: 전공 선택 (db[년도][버전]의 하위 키들)
         # 예: ['임상병리학과']
         if selected_year and selected_version:
-            # 여기서 db[selected_year][selected_version]을 읽어야 
-            # 'total_credits'가 아닌 '임상병리학과'가 옵션으로 나옵니다.
-            dept_list = list(db[selected_year][selected_version].keys())
+            dept_list = catalog.depts(selected_year, selected_version)
             selected_dept = st.selectbox("3️⃣ 전공 선택", dept_list, key="s_dept_final")
         else:
             selected_dept = "-"
             
     else:
         st.error("requirements.json 로드 실패. 파일 경로와 형식을 확인하세요.")
+        if catalog_error is not None:
+            with st.expander("오류 상세"):
+                st.code(str(catalog_error), language="text")
         selected_year, selected_version, selected_dept = "2025", "-", "-"
 
+    # OCR로 한두 글자 틀린 강의명을 requirements.json의 가장 가까운 정식 강의명으로 교정 (확실한 경우만)
+    autocorrect_names = st.toggle("🔤 OCR 강의명 자동 교정", value=False, help="예: '임상화학및실햄1' → '임상화학및실험1'")
+
     st.divider()
     
-    # 캐시 비우기 및 초기화 버튼
+    # 초기화 버튼 (수정된 JSON은 파일 수정 시각 기준으로 자동 반영되므로 캐시를 비울 필요 없음)
     if st.button("🔄 설정 초기화 및 새로고침"):
-        st.cache_data.clear() # 수정된 JSON을 새로 읽어오기 위해 필수
-        st.session_state.ocr_results = []
+        st.session_state.courses = CourseTable()
+        st.session_state.classified_for = None
+        session_store.drop(st.session_state.session_key)
         st.rerun()
     if st.button("🐛 버그 신고"):
         show_bug_report_dialog(selected_year, selected_dept)
 
+    # 운영자 전용 계측 패널: APP_ADMIN_TOKEN을 설정하고 ?admin=<토큰> 으로 접속했을 때만 표시
+    admin_token = os.environ.get("APP_ADMIN_TOKEN")
+    if admin_token and st.query_params.get("admin") == admin_token:
+        render_metrics_panel()
+
+# 분석이 끝나면 업로더를 비우므로, 입학년도/판정 기준/전공을 바꾸면 지금 강의 목록에서 이수구분만 다시 분류합니다.
+# 직접 고친 이수구분, 추가/삭제한 행, 고친 강의명은 그대로 둡니다.
+selection = (selected_year, selected_version, selected_dept)
+if st.session_state.classified_for and st.session_state.classified_for != selection:
+    st.session_state.courses, changed = reclassify_courses(
+        st.session_state.courses, get_course_index(*st.session_state.classified_for).classify, get_course_index(*selection).classify)
+    st.session_state.classified_for = selection
+    if changed:
+        st.toast(f"바뀐 기준으로 {changed}개 강의의 이수구분을 다시 분류했습니다. (직접 고친 행은 그대로)")
+
 # --- 4. 메인 UI ---
 st.title("🎓 연세대 임상병리학과 졸업요건 예비진단")
 st.markdown("##### **Made by**: 이재광")
@@ -211,71 +230,141 @@ st.info("""
 
 tab1, tab2 = st.tabs(["📸 이미지 분석", "✏️ 강의 수정 및 최종 진단"])
 
+def render_stream_preview(container, rows, done, total):
+    """OCR 진행 중 임시 결과(중복 제거 반영)와 잠정 학점 합계 표시"""
+    with container.container():
+        st.caption(f"⏳ {done}/{total}장 분석 완료 — 지금까지 {len(rows)}개 강의, 잠정 취득학점 {sum(r['학점'] for r in rows):g}학점 (나머지 이미지 분석 중)")
+        st.dataframe(pd.DataFrame(rows, columns=["강의명", "학점", "이수구분"]), use_container_width=True)
+
+# 분석 중에는 수정 탭 상단에도 임시 결과를 보여주기 위해 자리를 미리 잡아 둡니다.
+with tab2:
+    tab2_stream_box = st.empty()
+
 with tab1:
     if st.button("🖼️ 캡쳐 방법 안내"):
         show_capture_guide()
 
-    img_files = st.file_uploader("에브리타임 학점계산기 캡쳐 이미지 (PNG, JPG)", type=['png','jpg','jpeg'], accept_multiple_files=True)
-    if img_files and st.button("🔍 성적 이미지 분석 실행"):
-        all_results = []
-
-        with st.spinner(f"총 {len(img_files)}장의 이미지를 분석 중입니다..."):
-            for img in img_files: 
-                result = ocr_image_parsing(img, selected_year, selected_version, selected_dept)
-                all_results.extend(result)
-
-            # 강의명 기준 중복 제거 및 세션 상태 저장
+    uploads = st.file_uploader("에브리타임 학점계산기 캡쳐 이미지 (PNG, JPG) 또는 연세포탈 성적증명서 PDF", type=['png','jpg','jpeg','pdf'],
+                               accept_multiple_files=True, key=f"uploader_{st.session_state.uploader_gen}")
+    if uploads and st.button("🔍 성적 이미지 분석 실행"):
+        # 분류 인덱스는 메인 스레드에서 한 번만 꺼내고, 워커는 Streamlit에 접근하지 않습니다.
+        classify, correct = get_classifiers(*selection, autocorrect_names)
+        deduper = ocr_pipeline.IncrementalDeduper()
+
+        # [PDF] 텍스트 레이어가 있는 쪽은 OCR 없이 바로 읽고, 스캔 쪽만 이미지로 바꿔 아래 OCR 경로에 넘깁니다.
+        pdf_results = []
+        captures = []  # OCR할 (표시 이름, 이미지 바이트)
+        for f in uploads:
+            if not f.name.lower().endswith(".pdf"):
+                captures.append((f.name, f.getvalue()))
+                continue
+            # 쪽을 읽는 대로 반영 (텍스트 쪽은 바로 표에, 스캔 쪽은 OCR 목록에). 손상/암호화된 PDF는 읽은 쪽까지만 쓰고 나머지 업로드는 계속 분석
+            status = st.empty()
+            n_text = n_scan = n_rows = 0
+            try:
+                for page in pdf_transcript.iter_pdf_pages(f.getvalue()):
+                    if page.image is not None:
+                        captures.append((f"{f.name} {page.index + 1}쪽", page.image))
+                        n_scan += 1
+                    else:
+                        rows = pdf_transcript.classify_transcript_rows(page.rows, classify)
+                        pdf_results.extend(rows)
+                        deduper.add(rows)
+                        n_text += 1; n_rows += len(rows)
+                    status.caption(f"📄 '{f.name}': {page.index + 1}쪽 읽는 중... (지금까지 {n_rows}개 강의)")
+            except pdf_transcript.PdfReadError as e:
+                status.warning(f"📄 '{f.name}': {e} — "
+                               + (f"앞의 {n_text + n_scan}쪽만 분석합니다." if n_text + n_scan else "이 파일은 건너뜁니다."))
+                continue
+            if n_text:
+                status.caption(f"📄 '{f.name}': 텍스트 {n_text}쪽에서 {n_rows}개 강의를 바로 읽었습니다."
+                               + (f" 스캔된 {n_scan}쪽은 이미지로 분석합니다." if n_scan else ""))
+            else:
+                status.caption(f"📄 '{f.name}': 텍스트가 없는 스캔본입니다 — {n_scan}쪽을 이미지로 분석합니다.")
+
+        # [병렬 OCR + 스트리밍] 이미지가 끝나는 대로 결과를 표에 바로 반영합니다.
+        # OCR은 서버 전역 스케줄러의 워커에서 돌고(모든 세션이 코어 수만큼의 워커를 나눠 씀), 기다리는 동안 대기 순번을 표시합니다.
+        scheduler = get_scheduler()
+        names = [name for name, _ in captures]
+        images = [data for _, data in captures]
+        progress = st.progress(0.0, text=f"총 {len(images)}장의 이미지를 분석 중입니다...") if images else st.empty()
+        stream_box = st.empty()
+
+        # OCR 전에 같은 이미지/스크롤로 겹친 캡쳐를 찾아, 중복은 건너뛰고 겹친 캡쳐는 새로 보이는 아래쪽만 OCR
+        plans = plan_uploads(images)
+        start_ys = [None if plan.action == "skip" else plan.start_y for plan in plans]
+        for name, plan in zip(names, plans):
+            if plan.action == "skip":
+                st.caption(f"⏭️ '{name}': {plan.reason} — 분석을 건너뜁니다.")
+            elif plan.action == "crop":
+                st.caption(f"✂️ '{name}': {plan.reason} — 겹친 부분 아래만 분석합니다.")
+
+        done = 0
+        def show_queue_position(ticket):
+            ahead = ticket.position()
+            if ahead:
+                progress.progress(done / len(images), text=f"⏳ 분석 대기 중 — 앞에 {ahead}장 (약 {ticket.estimated_wait():g}초)")
+
+        def submit(func, jobs):
+            # 세션당 한도보다 많이 올렸으면 한도만큼씩 나눠 차례로 분석 (거절하지 않음)
+            return scheduler.iter_results(st.session_state.session_key, func, jobs, on_wait=show_queue_position)
+
+        results_per_image = [[] for _ in images]
+        stream = ocr_pipeline.iter_ocr_results(images, classify, correct=correct, start_ys=start_ys, submit=submit)
+        busy = None
+        try:
+            for idx, result in stream:
+                done += 1
+                results_per_image[idx] = result
+                deduper.add(result)
+                progress.progress(done / len(images), text=f"{done}/{len(images)} 완료 — '{names[idx]}' 분석 끝")
+                if done < len(images):
+                    for box in (stream_box, tab2_stream_box):
+                        render_stream_preview(box, deduper.rows(), done, len(images))
+        except SchedulerBusy as e:
+            busy = e
+        progress.empty()
+        stream_box.empty()
+        tab2_stream_box.empty()
+
+        # 최종 결과는 업로드 순서 기준으로 중복 제거 (끝난 순서와 무관하게 항상 같은 결과, PDF 텍스트 결과가 먼저)
+        all_results = pdf_results + [row for result in results_per_image for row in result]
+
+        if busy is not None:
+            # 대기열이 가득 찬 경우: 업로드한 이미지는 그대로 두고 잠시 후 다시 실행하도록 안내
+            st.warning(f"지금 분석 요청이 많아 대기열이 가득 찼습니다. 약 {busy.retry_after:g}초 후 다시 실행해 주세요.")
+        else:
+            # 강의명 기준 중복 제거 및 세션 상태 저장 ("채플"은 학기마다 따로 이수하므로 중복 제거 제외)
             if all_results:
-                df_all = pd.DataFrame(all_results)
-
-                # 1. "채플"이 포함된 행들만 따로 추출 (중복 제거 제외 대상)
-                # normalize_string을 사용하여 '채플', '채플(1)' 등을 모두 잡습니다.
-                is_chapel = df_all['강의명'].apply(lambda x: "채플" in x)
-                df_chapel = df_all[is_chapel]
-
-                # 2. 채플이 아닌 나머지 강의들만 추출하여 중복 제거 수행
-                df_others = df_all[~is_chapel].drop_duplicates(subset=['강의명'])
+                st.session_state.courses = CourseTable.from_records(ocr_pipeline.dedupe_courses(all_results))
+                st.session_state.classified_for = selection
+                st.success(f"분석 완료! 총 {len(st.session_state.courses)}개의 강의을 인식했습니다. (채플 포함)")                
+            # OCR이 끝난 이미지는 세션에 남기지 않음 (업로더 key를 바꿔 다음 화면부터 비움, OCR 결과는 캐시에 있음)
+            st.session_state.uploader_gen += 1
 
-                # 3. 두 데이터프레임을 다시 합치기
-                df_final = pd.concat([df_chapel, df_others], ignore_index=True)
-
-                # 세션 상태에 저장
-                st.session_state.ocr_results = df_final.to_dict('records')
-                st.success(f"분석 완료! 총 {len(st.session_state.ocr_results)}개의 강의을 인식했습니다. (채플 포함)")                
+        cache_stats = ocr_pipeline.ocr_cache_stats()
+        st.caption(f"OCR 캐시: 적중 {cache_stats['hits']}회 / 미적중 {cache_stats['misses']}회 (보관 {cache_stats['entries']}장)")
 
 with tab2:
     st.markdown("### 📝 수강 강의 관리")
 
     # --- 교과과정 이미지 출력 로직 추가 ---
-    img_path = f"images/{selected_year}_{selected_dept}.png"
-
-    try:
-        guide_img = Image.open(img_path)
-    
-        # 사이즈 조절 (이전 가이드 적용)
-        target_width = 500
-        width_percent = (target_width / float(guide_img.size[0]))
-        target_height = int((float(guide_img.size[1]) * float(width_percent)))
-        resized_img = guide_img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-
-        # [수정] 학번에 따른 캡션 분기 처리
-        # 2021년 미만인 경우 안내 문구 추가
-        if int(re.sub(r'[^0-9]', '', selected_year)) < 2021:
-            img_caption = f"📖 {selected_year}학번 가이드 (2021년도 자료 임시 적용)"
-        else:
-            img_caption = f"📖 {selected_year}학번 {selected_dept} 교과과정 가이드"
-
-        # 이미지 출력
-        st.image(resized_img, caption=img_caption)
+    # 500px 변환본은 미리 만들어 둔 것을 사용 (다시 그릴 때마다 원본을 열어 LANCZOS 축소하지 않음)
+    # [수정] 학번에 따른 캡션 분기 처리
+    # 2021년 미만인 경우 안내 문구 추가
+    if int(re.sub(r'[^0-9]', '', selected_year) or 0) < 2021:
+        img_caption = f"📖 {selected_year}학번 가이드 (2021년도 자료 임시 적용)"
+    else:
+        img_caption = f"📖 {selected_year}학번 {selected_dept} 교과과정 가이드"
 
-    except FileNotFoundError:
+    if not show_guide_image(f"{selected_year}_{selected_dept}.png", img_caption):
         st.caption(f"ℹ️ {selected_year}학번 가이드 이미지가 준비되지 않았습니다.")
         
     st.divider()
     st.caption("OCR 인식 결과(강의명, 학점, 이수구분 등)가 정확하지 않을 경우 수동으로 수정이 가능합니다. 행 왼쪽(체크박스)을 클릭하여 삭제하거나 하단에서 추가할 수 있습니다.")
 
     # 에디터용 데이터프레임 생성
-    df_editor = pd.DataFrame(st.session_state.ocr_results)
+    df_editor = pd.DataFrame(st.session_state.courses.columns())
     if df_editor.empty:
         df_editor = pd.DataFrame(columns=["강의명", "학점", "이수구분"])
 
@@ -295,7 +384,7 @@ with tab2:
         }, key="main_editor"
     )
     
-    st.session_state.ocr_results = edited_df.to_dict('records') #편집된 데이터를 즉시 세션에 저장하여 '추가하기' 버튼 클릭 시 초기화 방지
+    st.session_state.courses = CourseTable.from_records(edited_df.to_dict('records')) #편집된 데이터를 즉시 세션에 저장하여 '추가하기' 버튼 클릭 시 초기화 방지
     
     st.markdown("---")
     st.subheader("➕ 과목 직접 추가")
@@ -310,8 +399,7 @@ with tab2:
         
     if st.button("추가하기"):
         if new_name:
-            new_row = {"강의명": new_name, "학점": new_credit, "이수구분": new_type}
-            st.session_state.ocr_results.append(new_row)
+            st.session_state.courses.append(new_name, new_credit, new_type)
             st.rerun()
 
     # --- 5. 최종 분석 결과 표시 (심화학점 포함) ---
@@ -320,145 +408,34 @@ with tab2:
 
         final_courses = edited_df.to_dict('records')
 
-        criteria = db[selected_year][selected_version][selected_dept]
-        gen = criteria.get("general_education", {})
-        known = criteria.get("known_courses", {})
-
-        # 1. 기본 학점 변수 초기화
-        total_sum = 0.0
-        maj_req = 0.0
-        maj_sel = 0.0
-        advanced_sum = 0.0
-        detected_advanced = []
-        req_fail = []
-
-        # [영역 판정용 변수]
-        # 사용자가 선택한 이수구분 리스트에서 '교양('가 포함된 것만 추출
-        selected_areas = set()
-        for c in final_courses:
-            ftype = str(c['이수구분'])
-            if "교양(" in ftype:
-            # "교양(문학과예술)" -> "문학과예술"만 추출
-                area_name = ftype.split('(')[1].replace(')', '')
-                selected_areas.add(area_name)
-            
-        # [영역 판정 로직] 
-        
-        # 1. 대상 영역 및 이수 현황 정의
-        # 자연과우주, 생명과환경, 정보와기술을 제외한 7개 핵심 영역
-        target_areas = ["문학과예술", "인간과역사", "언어와표현", "가치와윤리", "국가와사회", "지역과세계", "체육과건강"]
-
-        # 사용자가 테이블에서 선택한 영역 중 7개 핵심 영역에 해당하는 것만 필터링
-        satisfied_core_areas = [area for area in selected_areas if area in target_areas]
-        satisfied_core_areas.sort() # 가나다순 정렬
-
-        # 2. 판정 로직 (7개 중 5개 필수)
-        required_core_count = 5
-        pass_areas = len(satisfied_core_areas) >= required_core_count
-        
-        if not pass_areas:
-            areas_str = ", ".join(satisfied_core_areas) if satisfied_core_areas else "없음"
-            req_fail.append(
-            f"교양 이수영역 선택 미달: 핵심 7개 영역 중 {len(satisfied_core_areas)}/{required_core_count}개 이수 "
-            f"(완료 영역: {areas_str})"
-        )
-
-        # 2. [NEW] 3000~4000단위(심화) 학점 계산
-        adv_keywords_clean = known.get("advanced_keywords", [])
-        norm_adv_keywords = sorted(list(set([normalize_string(kw) for kw in adv_keywords_clean])), key=len)
-
-        # 2. 모든 강의를 한 번에 순회하며 학점 합산 (중요!)
-        for c in final_courses:
-            c_name = str(c['강의명']).strip()
-            c_credit = float(c['학점'])
-            c_type = str(c['이수구분']).strip()
-            norm_name = normalize_string(c_name)
-
-            total_sum += c_credit
-
-            # [수정] 사용자가 테이블에서 선택한 '이수구분'을 최우선으로 반영
-            if c_type == "전공필수":
-                maj_req += c_credit
-            elif c_type == "전공선택":
-                maj_sel += c_credit
-
-            # 심화 학점 판정 (기존 로직 유지)
-            is_advanced_by_key = any(kw in norm_name for kw in norm_adv_keywords)
-            is_major = "전공" in c_type
-            basic_list = ["인체해부학", "의학용어", "해부학", "세포생물학", "병리학", "미생물학", "조직학"]
-            is_basic = any(basic == c_name for basic in basic_list)
-            is_advanced_work = any(word in c_name for word in ["진단", "종합설계", "임상실습"])
-
-            if is_advanced_by_key or (is_major and not (is_basic and not is_advanced_work)):
-                advanced_sum += c_credit
-                detected_advanced.append(c_name)
-
-        maj_total_sum = maj_req + maj_sel
-
-        # 3. 필수 과목 이수 여부 체크 (이수구분까지 확인)
-        all_course_names = [normalize_string(c['강의명']) for c in final_courses] # 리스트 먼저 정의
-        all_names_text = " ".join(all_course_names) # 그 다음 문자열로 합치기
-        
-        # 리더십 체크
-        leadership_count = len([c for c in final_courses if "리더십" in str(c['이수구분']) or "RC" in normalize_string(c['강의명'])])
-        if leadership_count < 2:
-            req_fail.append(f"리더십(개발/실습) ({leadership_count}/2강의 이수)")
-
-        career_design_keywords = ["진로지도", "진로설계"]
-        has_career_design = any(any(kw in name for kw in career_design_keywords) for name in all_course_names)
-        if not has_career_design:
-            req_fail.append("RC진로설계 (임상병리사진로지도)")
-
-        # [3] RC경력개발 체크 (3개 중 2개 필수)
-        # 대상: 커리어디자인, 산업과기업의이해, 공공기관의이해
-        career_dev_keywords = ["커리어디자인", "산업과기업의이해", "공공기관의이해"]
-        # 중복 수강은 없다고 가정하고, 키워드가 포함된 서로 다른 강의 수를 카운트
-        dev_count = 0
-        for kw in career_dev_keywords:
-            # kw를 normalize_string(kw)로 감싸서 name과 형식을 맞춥니다.
-            if any(normalize_string(kw) in name for name in all_course_names):
-                dev_count += 1
-    
-        if dev_count < 2:
-            req_fail.append(f"RC경력개발 ({dev_count}/2개 이수 중)")
-
-        # [4] 대학학문의세계 체크 (1개 필수)
-        if "대학학문의세계" not in all_names_text:
-            req_fail.append("대학학문의세계")
-
-        # [5] 기타 JSON 정의 필수교양 체크 (중복 로직 통합)
-        # gen.get("required_courses")를 순회하며 위에서 개별 체크한 항목(리더십, 진로경력, 대학학문)을 제외한 나머지만 체크
-        for item in gen.get("required_courses", []):
-            item_name = item['name']
-            # 이미 위에서 정밀하게 체크한 항목은 건너뜀
-            if item_name in ["리더십", "진로경력", "대학학문"]:
-                continue
-        
-            is_satisfied = any(any(normalize_string(kw) in name for kw in item["keywords"]) for name in all_course_names)
-            if not is_satisfied:
-                req_fail.append(item_name)
-
-        # [6] 전공필수 과목 체크 (이수구분 확인 포함)
-        # 임상병리학과 전공필수 판정 (키워드 매칭 기반)
-        for mr_course in known.get("major_required", []):
-            # "면역혈액" 처럼 핵심 단어만 추출 (보통 앞 4글자 혹은 전체)
-            core_keyword = normalize_string(mr_course)[:4]
-
-            is_passed = any(
-                (core_keyword in normalize_string(c['강의명'])) and (c['이수구분'] == "전공필수")
-                for c in final_courses
-            )
-            if not is_passed:
-                req_fail.append(f"전공필수({mr_course})")
-    
-        # 최종 판정 로직
-        pass_total = total_sum >= criteria['total_credits']
-        pass_major_total = maj_total_sum >= criteria['major_total']
-        pass_major_req = maj_req >= criteria['major_required']
-        pass_advanced = advanced_sum >= criteria['advanced_course']
-        pass_req_courses = len(req_fail) == 0
-
-        is_all_pass = all([pass_total, pass_major_total, pass_major_req, pass_advanced, pass_req_courses])
+        criteria = catalog.get(selected_year, selected_version, selected_dept)
+        if criteria is None:
+            st.error("선택한 입학년도/판정 기준/전공의 졸업요건을 찾을 수 없습니다.")
+            st.stop()
+        # 에디터에서 바뀐 행만 반영하는 증분 진단 (년도/버전/전공이 바뀌거나 requirements.json이 다시 컴파일되면 새로 생성)
+        # 메모리가 부족해 정리된 경우에도 새로 만들어 전체 목록으로 다시 계산
+        session_key = st.session_state.session_key
+        diag_state = session_store.get(session_key, "diag_state")
+        fresh = diag_state is None or diag_state.criteria is not criteria
+        if fresh:
+            diag_state = DiagnosisState(criteria)
+        n_before = len(diag_state)
+        with metrics.timer("diagnose"):
+            report = diag_state.sync(final_courses).report()
+        # 크기 추정은 객체 전체를 훑으므로 새로 만들었거나 행 수가 바뀐 경우에만 (셀 수정마다 하지 않음, 보관소의 객체는 그대로 갱신됨)
+        if fresh or len(diag_state) != n_before:
+            session_store.put(session_key, "diag_state", diag_state, estimate_size(diag_state, exclude=[criteria]))
+
+        total_sum = report["total_sum"]
+        maj_req = report["maj_req"]
+        maj_total_sum = report["maj_total_sum"]
+        advanced_sum = report["advanced_sum"]
+        detected_advanced = report["detected_advanced"]
+        leadership_count = report["leadership_count"]
+        req_fail = report["req_fail"]
+        pass_major_req = report["pass_major_req"]
+        pass_advanced = report["pass_advanced"]
+        is_all_pass = report["is_all_pass"]
 
         st.info("ℹ️ 본 진단 결과는 참고용이며, 정확한 졸업 여부는 학과 사무실을 통해 최종확인하시기 바랍니다.")
         st.header("🏁 졸업 자격 예비진단 리포트")
@@ -476,18 +453,18 @@ with tab2:
 
         # 대시보드 레이아웃 (4열 구성)
         m1, m2, m3, m4 = st.columns(4)
-        m1.metric("총 취득학점", f"{int(total_sum)} / {criteria['total_credits']}", delta=int(total_sum - criteria['total_credits']))
-        m2.metric("전공 합계", f"{int(maj_total_sum)} / {criteria['major_total']}")
-        m3.metric("3~4000단위(심화전공)", f"{int(advanced_sum)} / {criteria['advanced_course']}", delta=int(advanced_sum - criteria['advanced_course']), delta_color="normal")
+        m1.metric("총 취득학점", f"{int(total_sum)} / {criteria.total_credits}", delta=int(total_sum - criteria.total_credits))
+        m2.metric("전공 합계", f"{int(maj_total_sum)} / {criteria.major_total}")
+        m3.metric("3~4000단위(심화전공)", f"{int(advanced_sum)} / {criteria.advanced_course}", delta=int(advanced_sum - criteria.advanced_course), delta_color="normal")
         m4.metric("리더십(RC강의)", f"{leadership_count} / 2")
 
         # 세부 보완 사항 안내
         if not is_all_pass:
             with st.expander("🛠️ 세부 보완 필요 사항", expanded=True):
                 if not pass_major_req:
-                    st.warning(f"📍 **전공필수 학점**이 {int(criteria['major_required'] - maj_req)}학점 부족합니다.")
+                    st.warning(f"📍 **전공필수 학점**이 {int(criteria.major_required_credits - maj_req)}학점 부족합니다.")
                 if not pass_advanced:
-                    st.warning(f"📍 **3000~4000단위(심화전공) 학점**이 {int(criteria['advanced_course'] - advanced_sum)}학점 부족합니다.")
+                    st.warning(f"📍 **3000~4000단위(심화전공) 학점**이 {int(criteria.advanced_course - advanced_sum)}학점 부족합니다.")
 
                 if req_fail:
                     for fail_item in req_fail:
@@ -0,0 +1,146 @@
+"""교과과정/캡쳐 가이드 이미지의 표시용 사전 렌더링 (빌드 시 또는 앱 시작 시 한 번)
+
+images/ 안의 모든 이미지를 표시 폭(500px)과 레티나용 2배 폭으로 줄여 PNG/WebP로 저장해 두고,
+원본 파일 수정 시각(mtime)을 키로 메모리에 올려 둔 바이트를 그대로 내보냅니다.
+화면이 다시 그려질 때는 파일 stat 한 번뿐이고 이미지 디코딩/리샘플링은 하지 않습니다.
+
+사용법 (저장소 루트에서, 배포 전 미리 만들어 두기):
+  python assets.py                       # images/ → .asset_cache/
+  python assets.py --out static/guides   # Streamlit 정적 파일 서빙(server.enableStaticServing)용
+"""
+import argparse
+import hashlib
+import io
+import os
+import threading
+from collections import namedtuple
+
+from PIL import Image, features
+
+GUIDE_WIDTH = 500
+RETINA_SCALE = 2
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+ASSET_FORMATS = ("png", "webp") if features.check("webp") else ("png",)
+# 만들어 둘 (형식, 배율): PNG는 표시 폭(st.image용), 레티나(2x)는 용량이 작은 WebP로만 (WebP 미지원 시 PNG)
+VARIANTS = [("png", 1), ("webp", 1), ("webp", RETINA_SCALE)] if "webp" in ASSET_FORMATS else [("png", 1), ("png", RETINA_SCALE)]
+MIME_TYPES = {"png": "image/png", "webp": "image/webp"}
+
+# data: 표시용 바이트, path: 디스크에 저장된 파일 (정적 파일 서빙 시 URL로 사용)
+Variant = namedtuple("Variant", ["data", "mime", "width", "height", "path"])
+
+
+def _render(src_path, width, fmt):
+    """원본 → 폭 width로 축소(LANCZOS)한 이미지 바이트 (원본이 더 작으면 그대로 크기 유지)"""
+    with Image.open(src_path) as img:
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        if img.width > width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.Resampling.LANCZOS)
+        buf = io.BytesIO()
+        if fmt == "webp":
+            img.save(buf, format="WEBP", quality=85, method=4)
+        else:
+            img.save(buf, format="PNG", optimize=True)
+        return buf.getvalue(), img.size
+
+
+class AssetCache:
+    """원본 mtime 기준 (디스크 + 메모리) 변환본 캐시 (스레드 안전)"""
+
+    def __init__(self, src_dir="images", out_dir=".asset_cache", width=GUIDE_WIDTH):
+        self.src_dir = src_dir
+        self.out_dir = out_dir
+        self.width = width
+        self._mem = {}  # (이름, mtime_ns, 폭, 형식) → Variant
+        self._lock = threading.Lock()
+
+    def _out_path(self, name, mtime, width, fmt):
+        # 한글 파일명은 URL/파일시스템 호환을 위해 해시로 바꿔 저장
+        stem = hashlib.sha1(name.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.out_dir, f"{stem}.{mtime}.{width}w.{fmt}")
+
+    def variant(self, name, fmt="png", scale=1):
+        """images/{name}의 표시용 변환본. 원본이 없으면 None"""
+        src = os.path.join(self.src_dir, name)
+        try:
+            mtime = os.stat(src).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        width = self.width * scale
+        key = (name, mtime, width, fmt)
+        cached = self._mem.get(key)
+        if cached is not None: return cached
+
+        with self._lock:
+            cached = self._mem.get(key)
+            if cached is not None: return cached
+            path = self._out_path(name, mtime, width, fmt)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                with Image.open(io.BytesIO(data)) as img:  # 헤더만 읽어 크기 확인
+                    size = img.size
+            except (FileNotFoundError, OSError):
+                data, size = _render(src, width, fmt)
+                self._write(path, data)
+            # 같은 원본의 이전 mtime 변환본은 메모리에서 제거
+            for old in [k for k in self._mem if k[0] == name and k[2] == width and k[3] == fmt]:
+                del self._mem[old]
+            variant = Variant(data, MIME_TYPES[fmt], size[0], size[1], path)
+            self._mem[key] = variant
+            return variant
+
+    def _write(self, path, data):
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # 읽기 전용 배포 환경: 메모리에만 보관
+
+    def names(self):
+        try:
+            return sorted(n for n in os.listdir(self.src_dir) if n.lower().endswith(IMAGE_EXTENSIONS))
+        except FileNotFoundError:
+            return []
+
+    def prebuild(self):
+        """images/의 모든 파일 × VARIANTS 변환본을 만들어 메모리에 올림. 만든 개수 반환"""
+        count = 0
+        for name in self.names():
+            for fmt, scale in VARIANTS:
+                if self.variant(name, fmt, scale) is not None: count += 1
+        return count
+
+    def memory_bytes(self):
+        return sum(len(v.data) for v in list(self._mem.values()))
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_asset_cache(out_dir=".asset_cache", src_dir="images", prebuild=True):
+    """프로세스 전역 AssetCache. 처음 만들 때 백그라운드 스레드에서 전체 변환본을 미리 생성"""
+    key = (os.path.abspath(src_dir), os.path.abspath(out_dir))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = AssetCache(src_dir, out_dir)
+            if prebuild:
+                threading.Thread(target=cache.prebuild, name="asset-prebuild", daemon=True).start()
+        return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--src", default="images")
+    parser.add_argument("--out", default=".asset_cache")
+    args = parser.parse_args()
+    cache = AssetCache(args.src, args.out)
+    n = cache.prebuild()
+    print(f"{len(cache.names())}개 이미지 → 변환본 {n}개 ({cache.memory_bytes() / 1024:.0f}KB) → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
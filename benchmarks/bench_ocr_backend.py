@@ -0,0 +1,67 @@
+"""OCR 백엔드별 이미지당 지연시간 비교 (pytesseract: 매번 프로세스 실행 vs tesserocr: 상주 엔진)
+
+사용법 (저장소 루트에서): python benchmarks/bench_ocr_backend.py [--repeat 3] [이미지 ...]
+이미지를 지정하지 않으면 images/ 폴더의 이미지를 사용합니다. 전처리/ROI는 미리 끝낸 뒤 OCR 호출만 측정하며,
+tesserocr는 첫 호출(엔진 초기화 포함)을 따로 보고합니다.
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ocr_backends  # noqa: E402
+import ocr_pipeline  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = args.images or sorted(
+        p for p in glob.glob(os.path.join(ROOT, "images", "*")) if p.lower().endswith(('.png', '.jpg', '.jpeg'))
+    )
+    prepared = []
+    for path in paths:
+        img = ocr_pipeline.preprocess_image(open(path, 'rb').read())
+        prepared.append((os.path.basename(path), ocr_pipeline.crop_table_region(img)[0]))
+
+    backends = [ocr_backends.PytesseractBackend(), ocr_backends.TesserocrBackend(max_engines=1)]
+    backends = [b for b in backends if b.available()]
+    if not backends:
+        sys.exit("사용 가능한 OCR 백엔드가 없습니다 (tesseract 또는 tesserocr 설치 필요).")
+
+    results = {}
+    for backend in backends:
+        t = time.perf_counter()
+        backend.recognize(prepared[0][1])
+        first_call = time.perf_counter() - t
+        per_image = []
+        for _, img in prepared:
+            times = []
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                backend.recognize(img)
+                times.append(time.perf_counter() - t)
+            per_image.append(statistics.median(times))
+        results[backend.name] = (first_call, per_image)
+
+    names = [b.name for b in backends]
+    print(f"{'image':40s}" + "".join(f"{n:>16s}" for n in names))
+    for i, (name, _) in enumerate(prepared):
+        print(f"{name[:40]:40s}" + "".join(f"{results[n][1][i] * 1000:14.1f}ms" for n in names))
+    print(f"{'평균':38s}" + "".join(f"{statistics.mean(results[n][1]) * 1000:14.1f}ms" for n in names))
+    print(f"{'첫 호출(초기화 포함)':30s}" + "".join(f"{results[n][0] * 1000:14.1f}ms" for n in names))
+    if len(names) == 2:
+        base, fast = (statistics.mean(results[n][1]) for n in names)
+        print(f"\n이미지당 {(base - fast) * 1000:.1f}ms 단축 ({base / fast:.2f}배)")
+
+
+if __name__ == "__main__":
+    main()
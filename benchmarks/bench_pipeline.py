@@ -0,0 +1,179 @@
+"""OCR → 파싱 → 분류 → 진단 파이프라인 단계별 성능/정확도 벤치마크 (합성 캡쳐 사용)
+
+사용법 (저장소 루트에서):
+  python benchmarks/bench_pipeline.py                       # 기본: kor/eng × 폭 720,1280,1800 × 강의 5,10,20
+  python benchmarks/bench_pipeline.py --lang kor --widths 1280 --courses 8 --images 5 --json out.json
+  python benchmarks/bench_pipeline.py --no-ocr              # tesseract 없이 파싱/분류/진단만 측정
+
+오프라인 리눅스(tesseract-ocr, tesseract-ocr-kor 설치)에서 동작합니다.
+한글 합성에는 한글 글꼴이 필요합니다(fonts-nanum 등, 또는 --font/BENCH_FONT로 지정).
+"""
+import argparse
+import difflib
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ocr_pipeline  # noqa: E402
+import synthetic  # noqa: E402
+from course_index import normalize_string  # noqa: E402
+from diagnosis import DiagnosisState  # noqa: E402
+from requirements_model import load_catalog  # noqa: E402
+
+STAGES = ["preprocess", "roi", "ocr", "parse", "classify", "diagnose"]
+
+
+def tesseract_available():
+    return ocr_pipeline.get_backend().available()
+
+
+def accuracy(parsed, truth):
+    """정답 대비 인식 정확도: 강의명(정규화)+학점 일치 기준 재현율/정밀도, 강의명 유사도 평균"""
+    truth_keys = [(normalize_string(name), credit) for name, credit in truth]
+    parsed_keys = [(normalize_string(row.name), row.credit) for row in parsed]
+    remaining = list(parsed_keys)
+    matched = 0
+    for key in truth_keys:
+        if key in remaining:
+            remaining.remove(key); matched += 1
+    similarity = []
+    for name, _ in truth_keys:
+        best = max((difflib.SequenceMatcher(None, name, p).ratio() for p, _ in parsed_keys), default=0.0)
+        similarity.append(best)
+    return {
+        "recall": matched / len(truth_keys) if truth_keys else 1.0,
+        "precision": matched / len(parsed_keys) if parsed_keys else 0.0,
+        "name_similarity": sum(similarity) / len(similarity) if similarity else 1.0,
+    }
+
+
+def run_one(image, criteria, use_ocr, preprocess_mode):
+    """이미지 한 장을 단계별로 실행하고 (단계별 소요시간, 파싱 결과) 반환"""
+    times = {}
+    t = time.perf_counter()
+    img = ocr_pipeline.preprocess_image(image.png, preprocess_mode)
+    times["preprocess"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    table_img, _ = ocr_pipeline.crop_table_region(img)
+    times["roi"] = time.perf_counter() - t
+
+    if use_ocr:
+        t = time.perf_counter()
+        lines = ocr_pipeline.recognize_lines(table_img)
+        times["ocr"] = time.perf_counter() - t
+    else:
+        # OCR 없이 측정할 때는 정답을 OCR 결과 줄 형태로 흉내 냄
+        lines = [ocr_pipeline.OCRLine(f"{name} {credit:g} A+", 100.0) for name, credit in image.truth]
+        times["ocr"] = 0.0
+
+    t = time.perf_counter()
+    rows = ocr_pipeline.parse_lines(lines)
+    times["parse"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    classified = ocr_pipeline.classify_rows(rows, criteria.index.classify)
+    times["classify"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    DiagnosisState(criteria).sync(classified).report()
+    times["diagnose"] = time.perf_counter() - t
+    return times, rows
+
+
+def bench_config(images, criteria, use_ocr, preprocess_mode):
+    totals = {stage: 0.0 for stage in STAGES}
+    acc = {"recall": 0.0, "precision": 0.0, "name_similarity": 0.0}
+    n_courses = 0
+    for image in images:
+        times, rows = run_one(image, criteria, use_ocr, preprocess_mode)
+        for stage, dt in times.items(): totals[stage] += dt
+        for k, v in accuracy(rows, image.truth).items(): acc[k] += v
+        n_courses += len(image.truth)
+
+    # 최대 메모리: 한 장을 tracemalloc 켜고 다시 실행 (시간 측정과 분리)
+    tracemalloc.start()
+    run_one(images[0], criteria, use_ocr, preprocess_mode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    n = len(images)
+    end_to_end = sum(totals.values())
+    return {
+        "ms_per_image": {stage: totals[stage] / n * 1000 for stage in STAGES},
+        "images_per_s": n / end_to_end if end_to_end else float("inf"),
+        "courses_per_s": n_courses / end_to_end if end_to_end else float("inf"),
+        "courses_per_s_after_ocr": n_courses / max(totals["parse"] + totals["classify"] + totals["diagnose"], 1e-9),
+        "peak_traced_mb": peak / 1024 / 1024,
+        "accuracy": {k: v / n for k, v in acc.items()} if use_ocr else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lang", choices=["kor", "eng", "both"], default="both")
+    parser.add_argument("--widths", default="720,1280,1800", help="캡쳐 폭(px), 쉼표 구분")
+    parser.add_argument("--courses", default="5,10,20", help="이미지당 강의 수, 쉼표 구분")
+    parser.add_argument("--images", type=int, default=3, help="설정별 이미지 수")
+    parser.add_argument("--preprocess", choices=["pil", "numpy"], default=ocr_pipeline.OCR_PREPROCESS)
+    parser.add_argument("--font", help="한글 글꼴 경로")
+    parser.add_argument("--no-ocr", action="store_true", help="tesseract 단계 생략")
+    parser.add_argument("--year", default="2021")
+    parser.add_argument("--version", default="졸업요건 기준")
+    parser.add_argument("--dept", default="임상병리학과")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    catalog = load_catalog(os.path.join(ROOT, "requirements.json"))
+    criteria = catalog.get(args.year, args.version, args.dept)
+    if criteria is None:
+        sys.exit(f"졸업요건 없음: {args.year}/{args.version}/{args.dept}")
+
+    use_ocr = not args.no_ocr
+    if use_ocr and not tesseract_available():
+        print("⚠️ tesseract를 찾을 수 없어 OCR 단계 없이 측정합니다 (--no-ocr).", file=sys.stderr)
+        use_ocr = False
+
+    langs = ["kor", "eng"] if args.lang == "both" else [args.lang]
+    font = synthetic.find_korean_font(args.font)
+    if "kor" in langs and font is None:
+        print("⚠️ 한글 글꼴이 없어 kor 설정을 건너뜁니다 (--font 또는 BENCH_FONT 지정).", file=sys.stderr)
+        langs = [lang for lang in langs if lang != "kor"]
+
+    widths = [int(w) for w in args.widths.split(",")]
+    counts = [int(c) for c in args.courses.split(",")]
+
+    results = []
+    header = f"{'lang':4s} {'width':>5s} {'n':>3s} " + " ".join(f"{s:>10s}" for s in STAGES) + f" {'img/s':>7s} {'course/s':>9s} {'peakMB':>7s} {'recall':>6s} {'prec':>6s}"
+    print(header)
+    print("-" * len(header))
+    for lang in langs:
+        for width in widths:
+            for n in counts:
+                images = synthetic.generate(catalog, args.images, n, width, lang, font, seed=args.seed)
+                r = bench_config(images, criteria, use_ocr, args.preprocess)
+                r.update({"lang": lang, "width": width, "n_courses": n, "images": args.images,
+                          "ocr": use_ocr, "preprocess": args.preprocess})
+                results.append(r)
+                acc = r["accuracy"] or {}
+                print(f"{lang:4s} {width:5d} {n:3d} "
+                      + " ".join(f"{r['ms_per_image'][s]:8.2f}ms" for s in STAGES)
+                      + f" {r['images_per_s']:7.2f} {r['courses_per_s']:9.1f} {r['peak_traced_mb']:7.1f}"
+                      + (f" {acc['recall']:6.2f} {acc['precision']:6.2f}" if acc else f" {'-':>6s} {'-':>6s}"))
+
+    print(f"\n프로세스 최대 RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f}MB")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
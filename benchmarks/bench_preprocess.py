@@ -0,0 +1,79 @@
+"""전처리 마이크로 벤치마크: 기존 PIL 체인 vs NumPy 단일 버퍼 방식
+
+사용법 (저장소 루트에서): python benchmarks/bench_preprocess.py [--repeat 5] [이미지 ...]
+이미지를 지정하지 않으면 images/ 폴더의 PNG/JPG를 모두 사용합니다.
+모드별로 새 프로세스에서 실행하여 최대 메모리(ru_maxrss) 증가량을 따로 측정합니다.
+"""
+import argparse
+import glob
+import multiprocessing as mp
+import os
+import resource
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = [
+    ("pil", {}),
+    ("numpy", {"binarize": ""}),
+    ("numpy+otsu", {"binarize": "otsu"}),
+    ("numpy+sauvola", {"binarize": "sauvola"}),
+]
+
+
+def _run_mode(mode, kwargs, paths, repeat, queue):
+    import ocr_pipeline
+
+    blobs = [open(p, 'rb').read() for p in paths]
+    if mode == "pil":
+        func = ocr_pipeline.preprocess_image_pil
+    else:
+        func = lambda b: ocr_pipeline.preprocess_image_numpy(b, **kwargs)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    per_image = []
+    for blob in blobs:
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            func(blob)
+            times.append(time.perf_counter() - t0)
+        per_image.append(statistics.median(times))
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((mode, per_image, (rss_after - rss_before) / 1024.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paths = args.images or sorted(
+        p for p in glob.glob(os.path.join(ROOT, "images", "*")) if p.lower().endswith(('.png', '.jpg', '.jpeg'))
+    )
+    if not paths:
+        sys.exit("벤치마크할 이미지가 없습니다.")
+
+    ctx = mp.get_context("spawn")
+    results = {}
+    for mode, kwargs in MODES:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_mode, args=(mode, kwargs, paths, args.repeat, queue))
+        proc.start()
+        name, per_image, peak_mb = queue.get()
+        proc.join()
+        results[name] = (per_image, peak_mb)
+
+    print(f"{'image':40s}" + "".join(f"{m:>16s}" for m, _ in MODES))
+    for i, path in enumerate(paths):
+        print(f"{os.path.basename(path)[:40]:40s}" + "".join(f"{results[m][0][i] * 1000:14.1f}ms" for m, _ in MODES))
+    print(f"{'합계':38s}" + "".join(f"{sum(results[m][0]) * 1000:14.1f}ms" for m, _ in MODES))
+    print(f"{'최대 메모리 증가(MB)':32s}" + "".join(f"{results[m][1]:14.1f}MB" for m, _ in MODES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""여러 세션이 동시에 "분석 실행"을 누르는 상황을 흉내 낸 OCR 스케줄러 부하 테스트
+
+사용법 (저장소 루트에서):
+  python benchmarks/load_test_scheduler.py                          # 30세션 × 이미지 2~8장, 가짜 작업(sleep)
+  python benchmarks/load_test_scheduler.py --job cpu --baseline     # 작업마다 CPU를 쓰는 하위 프로세스, 세션별 스레드 풀과 비교
+  python benchmarks/load_test_scheduler.py --job ocr --sessions 10  # 합성 캡쳐로 실제 OCR (tesseract 필요)
+
+작업 종류
+  sleep: 지정한 시간만큼 대기 (스케줄링/공정성/대기 순번만 확인, 코어를 쓰지 않음)
+  cpu:   tesseract처럼 별도 프로세스를 띄워 지정한 시간만큼 CPU를 사용 (과점유 효과 확인)
+  ocr:   benchmarks/synthetic.py 합성 캡쳐를 ocr_image_parsing으로 실제 처리
+--baseline은 같은 부하를 스케줄러 없이 세션마다 자체 스레드 풀(OCR_WORKERS)로 처리한 결과를 함께 보여줍니다.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ocr_pipeline  # noqa: E402
+from ocr_scheduler import OCRScheduler, SchedulerBusy  # noqa: E402
+
+# 벽시계가 아니라 CPU 시간 기준으로 돌아야 코어를 나눠 쓸 때 느려지는 효과가 드러남
+CPU_BURN = "import sys, time\nend = time.process_time() + float(sys.argv[1])\nwhile time.process_time() < end: pass\n"
+
+
+def make_job(kind, job_ms, images=None):
+    """작업 함수 func(item). item은 (세션 번호, 전체 이미지 번호)"""
+    if kind == "sleep":
+        return lambda item: time.sleep(job_ms / 1000)
+    if kind == "cpu":
+        return lambda item: subprocess.run([sys.executable, "-c", CPU_BURN, str(job_ms / 1000)], check=True)
+    # 이미지마다 다른 합성 캡쳐를 쓰므로 OCR 캐시에 걸리지 않음. 분류는 측정 대상이 아님
+    return lambda item: ocr_pipeline.ocr_image_parsing(images[item[1]].png, lambda name: "미분류")
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values: return 0.0
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def simulate(sessions, func, use_scheduler, scheduler=None, poll=0.05):
+    """sessions: [(도착 시각 초, 이미지 수)] → 세션별 결과 dict 리스트"""
+    results = [None] * len(sessions)
+    offsets = [sum(n for _, n in sessions[:sid]) for sid in range(len(sessions))]
+    start = time.perf_counter()
+
+    def run_session(sid, arrival, n_images):
+        time.sleep(arrival)
+        t0 = time.perf_counter()
+        record = {"session": sid, "images": n_images, "arrival": arrival, "rejected": False,
+                  "first_result": None, "turnaround": None, "max_position": 0}
+        items = [(sid, offsets[sid] + i) for i in range(n_images)]
+        try:
+            if use_scheduler:
+                ticket = scheduler.submit(f"session-{sid}", func, items)
+                record["max_position"] = ticket.position()
+                def on_wait(t):
+                    record["max_position"] = max(record["max_position"], t.position())
+                stream = ticket.results(on_wait=on_wait, poll=poll)
+            else:
+                stream = ocr_pipeline.iter_completed(func, items)
+            for _ in stream:
+                if record["first_result"] is None:
+                    record["first_result"] = time.perf_counter() - t0
+            record["turnaround"] = time.perf_counter() - t0
+        except SchedulerBusy as e:
+            record["rejected"] = True
+            record["retry_after"] = e.retry_after
+        results[sid] = record
+
+    threads = [threading.Thread(target=run_session, args=(sid, arrival, n)) for sid, (arrival, n) in enumerate(sessions)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return results, time.perf_counter() - start
+
+
+def report(label, results, wall):
+    served = [r for r in results if not r["rejected"]]
+    images = sum(r["images"] for r in served)
+    turnaround = [r["turnaround"] for r in served]
+    first = [r["first_result"] for r in served if r["first_result"] is not None]
+    # 공정성: 이미지 한 장당 소요 시간이 세션 간에 얼마나 고른지 (최대/최소, 1에 가까울수록 고름)
+    per_image = [r["turnaround"] / r["images"] for r in served if r["images"]]
+    summary = {
+        "label": label,
+        "sessions": len(results),
+        "rejected": len(results) - len(served),
+        "images": images,
+        "wall_s": round(wall, 2),
+        "throughput_img_s": round(images / wall, 2) if wall else 0.0,
+        "first_result_p50_s": round(percentile(first, 50), 2),
+        "first_result_p95_s": round(percentile(first, 95), 2),
+        "turnaround_p50_s": round(percentile(turnaround, 50), 2),
+        "turnaround_p95_s": round(percentile(turnaround, 95), 2),
+        "turnaround_max_s": round(max(turnaround, default=0.0), 2),
+        "per_image_spread": round(max(per_image) / min(per_image), 2) if per_image else 0.0,
+        "max_queue_position": max((r["max_position"] for r in results), default=0),
+    }
+    print(f"\n[{label}] 세션 {summary['sessions']}개 (거절 {summary['rejected']}), 이미지 {images}장, {summary['wall_s']}초 "
+          f"→ {summary['throughput_img_s']}장/초")
+    print(f"  첫 결과까지   p50 {summary['first_result_p50_s']}초 / p95 {summary['first_result_p95_s']}초")
+    print(f"  전체 완료까지 p50 {summary['turnaround_p50_s']}초 / p95 {summary['turnaround_p95_s']}초 / 최대 {summary['turnaround_max_s']}초")
+    print(f"  장당 소요시간 세션 간 편차(최대/최소) {summary['per_image_spread']}, 최대 대기 순번 {summary['max_queue_position']}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--images", default="2-8", help="세션당 이미지 수 범위 (예: 2-8 또는 5)")
+    parser.add_argument("--arrival", type=float, default=1.0, help="세션 도착 시각을 0~N초에 고르게 흩뿌림")
+    parser.add_argument("--job", choices=["sleep", "cpu", "ocr"], default="sleep")
+    parser.add_argument("--job-ms", type=float, default=300, help="sleep/cpu 작업 한 건의 시간(ms)")
+    parser.add_argument("--workers", type=int, default=None, help="스케줄러 워커 수 (기본: 코어 수)")
+    parser.add_argument("--max-queue", type=int, default=200)
+    parser.add_argument("--max-per-session", type=int, default=30)
+    parser.add_argument("--baseline", action="store_true", help="세션별 스레드 풀(기존 방식)과 비교")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과 요약을 JSON으로 저장")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lo, _, hi = args.images.partition("-")
+    lo, hi = int(lo), int(hi or lo)
+    sessions = sorted((rng.uniform(0, args.arrival), rng.randint(lo, hi)) for _ in range(args.sessions))
+
+    images = None
+    if args.job == "ocr":
+        import synthetic
+        from requirements_model import load_catalog
+        if not ocr_pipeline.get_backend().available():
+            sys.exit("tesseract를 찾을 수 없습니다. --job sleep 또는 --job cpu를 사용하세요.")
+        total = sum(n for _, n in sessions)
+        images = synthetic.generate(load_catalog(os.path.join(ROOT, "requirements.json")), total, 10, 1280,
+                                    font_path=synthetic.find_korean_font(), seed=args.seed)
+    func = make_job(args.job, args.job_ms, images)
+
+    scheduler = OCRScheduler(args.workers, args.max_queue, args.max_per_session)
+    print(f"작업={args.job}, 세션 {args.sessions}개, 세션당 이미지 {lo}~{hi}장, 도착 0~{args.arrival}초, "
+          f"스케줄러 워커 {scheduler.workers}개 (코어 {os.cpu_count()}개)")
+    summaries = [report("scheduler", *simulate(sessions, func, True, scheduler))]
+    if args.baseline:
+        summaries.append(report(f"baseline (세션마다 스레드 {ocr_pipeline.resolve_worker_count()}개)",
+                                *simulate(sessions, func, False)))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
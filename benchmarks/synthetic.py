@@ -0,0 +1,135 @@
+"""에브리타임 학점계산기 화면을 흉내 낸 합성 캡쳐 이미지 생성기 (정답 강의 목록 포함)
+
+강의명은 requirements.json(교양 영역 + 전공 과목)에서 뽑습니다.
+lang="kor"는 한글 강의명, lang="eng"는 영문 강의명/학수번호(TOEIC, YHA1002 등)만 사용합니다.
+"""
+import io
+import os
+import random
+from collections import namedtuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+# 한글 글꼴 후보 (fonts-nanum / fonts-noto-cjk 패키지 기본 경로)
+KOREAN_FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/truetype/nanum/NanumBarunGothic.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+    "C:/Windows/Fonts/malgun.ttf",
+]
+
+LABELS = {
+    "kor": {"title": "학점계산기", "semester": "4학년 2학기", "summary": "평점 4.3   전공 0   취득 {total}",
+            "header": ("과목명", "학점", "성적", "전공"), "more": "더 입력하기"},
+    "eng": {"title": "GPA Calculator", "semester": "Year 4 Fall", "summary": "GPA 4.3   Major 0   Credits {total}",
+            "header": ("Course", "Credit", "Grade", "Major"), "more": "Add more"},
+}
+
+# 열 경계 (화면 폭 비율): 과목명 | 학점 | 성적 | 전공
+COLUMNS = [0.02, 0.54, 0.685, 0.833, 0.98]
+
+SyntheticImage = namedtuple("SyntheticImage", ["png", "truth", "width", "height", "lang"])
+
+
+def find_korean_font(explicit=None):
+    """사용할 한글 글꼴 경로 (없으면 None)"""
+    for path in [explicit, os.environ.get("BENCH_FONT")] + KOREAN_FONT_CANDIDATES:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+def course_pool(catalog, lang):
+    """requirements.json에서 합성에 쓸 강의명 목록"""
+    names = [name for courses in catalog.area_courses.values() for name in courses]
+    for req in catalog.entries.values():
+        names.extend(req.major_required)
+        names.extend(req.major_elective)
+        if lang == "eng":
+            names.extend(kw for item in req.required_courses for kw in item.raw_keywords)
+    names = list(dict.fromkeys(names))
+    if lang == "eng":
+        return [n for n in names if n.isascii() and len(n) >= 3]
+    return [n for n in names if not n.isascii()]
+
+
+def sample_courses(pool, n_courses, rng):
+    """정답 (강의명, 학점) 목록 — 같은 학기 안에서는 중복 없이"""
+    names = rng.sample(pool, min(n_courses, len(pool)))
+    while len(names) < n_courses:
+        names.append(rng.choice(pool))
+    return [(name, float(rng.choice([1, 2, 3, 3, 3]))) for name in names]
+
+
+def _font(path, size):
+    if path:
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size)
+
+
+def render_transcript(courses, width=1280, lang="kor", font_path=None, blank_rows=3):
+    """강의 목록을 에브리타임 성적 화면처럼 그린 PNG 바이트"""
+    labels = LABELS[lang]
+    s = width / 900.0
+    row_h = int(89 * s)
+    n_rows = len(courses) + blank_rows
+    table_top = int(905 * s)
+    height = table_top + row_h * (n_rows + 1) + int(110 * s)
+
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    big, mid, small = _font(font_path, int(42 * s)), _font(font_path, int(28 * s)), _font(font_path, int(24 * s))
+
+    # 상단 헤더 + 학기 탭 + 요약
+    draw.rectangle([0, 0, width, int(102 * s)], fill=(17, 17, 17))
+    draw.text((int(52 * s), int(25 * s)), labels["title"], font=mid, fill=(255, 255, 255))
+    draw.text((int(52 * s), int(775 * s)), labels["semester"], font=big, fill=(30, 30, 30))
+    total = int(sum(credit for _, credit in courses))
+    draw.text((int(52 * s), int(843 * s)), labels["summary"].format(total=total), font=small, fill=(60, 60, 60))
+    draw.rounded_rectangle([int(18 * s), int(200 * s), width - int(18 * s), int(715 * s)], radius=int(20 * s), outline=(225, 225, 225), width=max(1, int(2 * s)))
+
+    # 성적 표
+    left, right = int(COLUMNS[0] * width), int(COLUMNS[-1] * width)
+    bottom = table_top + row_h * (n_rows + 1)
+    line = (228, 228, 228)
+    for i in range(n_rows + 2):
+        y = table_top + row_h * i
+        draw.line([left, y, right, y], fill=line, width=max(1, int(2 * s)))
+    for x in COLUMNS[1:-1]:
+        draw.line([int(x * width), table_top, int(x * width), bottom], fill=line, width=max(1, int(2 * s)))
+
+    def cell(col, row, text, color):
+        x = int(COLUMNS[col] * width) + int(28 * s)
+        y = table_top + row_h * row + (row_h - int(30 * s)) // 2
+        draw.text((x, y), text, font=mid, fill=color)
+
+    for col, text in enumerate(labels["header"]):
+        cell(col, 0, text, (150, 150, 150))
+    rows = list(courses) + [("", 0)] * blank_rows
+    for r, (name, credit) in enumerate(rows, start=1):
+        if name: cell(0, r, name, (40, 40, 40))
+        cell(1, r, f"{credit:g}", (40, 40, 40))
+        cell(2, r, "A+", (40, 40, 40))
+        box = int(28 * s)
+        cx, cy = int((COLUMNS[3] + COLUMNS[4]) / 2 * width) - box // 2, table_top + row_h * r + (row_h - box) // 2
+        draw.rounded_rectangle([cx, cy, cx + box, cy + box], radius=int(6 * s), outline=(200, 200, 200), width=max(1, int(2 * s)))
+    draw.text((int(52 * s), bottom + int(30 * s)), labels["more"], font=small, fill=(220, 40, 40))
+
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue(), height
+
+
+def generate(catalog, n_images, n_courses, width, lang="kor", font_path=None, seed=0):
+    """SyntheticImage 리스트 생성"""
+    rng = random.Random(seed)
+    pool = course_pool(catalog, lang)
+    images = []
+    for _ in range(n_images):
+        truth = sample_courses(pool, n_courses, rng)
+        png, height = render_transcript(truth, width, lang, font_path)
+        images.append(SyntheticImage(png, truth, width, height, lang))
+    return images
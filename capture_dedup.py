@@ -0,0 +1,134 @@
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+from metrics import metrics
+from ocr_pipeline import load_resized_gray, detect_table_rows
+
+# --- OCR 전 캡쳐 중복/겹침 검사 ---
+# 같은 학기를 두 번 올리거나, 스크롤하며 반쯤 겹치게 캡쳐한 이미지를 tesseract에 넘기기 전에 걸러냅니다.
+# - 이미지 전체와 표의 각 행(가로 띠)에 대해 dHash(인접 픽셀 밝기 차이) 지문을 만듭니다.
+#   지문이 가까운 행만 축소 썸네일을 픽셀 단위로 한 번 더 비교합니다 (학수번호 숫자 하나 차이는 지문만으로 구분이 어려움).
+# - 바이트가 같거나, 표의 모든 행이 앞선 이미지와 같거나, 앞선 이미지의 연속된 행 안에 모두 들어 있으면 OCR을 생략합니다.
+# - 직전 캡쳐의 마지막 행들이 이번 캡쳐의 첫 행들과 같으면(스크롤 겹침) 겹친 행 아래쪽만 OCR합니다.
+# 좌표는 OCR 전처리와 같은 크기(OCR_TARGET_WIDTH로 축소된 흑백 이미지) 기준입니다.
+
+IMAGE_HASH_SIZE = (16, 16)   # 전체 이미지 dHash
+IMAGE_HASH_MAX_BITS = 12
+ROW_HASH_SIZE = (256, 16)    # 행 dHash (밝기 차이가 HASH_MARGIN 이하인 평탄한 배경은 0 → JPEG 잡음에 강함)
+ROW_HASH_MAX_BITS = 48       # 후보로 볼 최대 해밍 거리 (이후 썸네일로 확정)
+HASH_MARGIN = 16
+ROW_THUMB_SIZE = (512, 32)   # 행 확정 비교용 썸네일
+ROW_THUMB_DELTA = 48         # 이 이상 밝기가 다른 픽셀을 "다른 픽셀"로 셈
+ROW_THUMB_MAX_PIXELS = 2     # 다른 픽셀이 이보다 많으면 다른 행
+OVERLAP_MIN_ROWS = 2         # 채플처럼 같은 행이 학기마다 있을 수 있으므로 2행 이상 연속으로 같을 때만 겹침으로 인정
+OVERLAP_MAX_HEADER_ROWS = 2  # 이번 캡쳐 상단에서 건너뛸 수 있는 행 수 (표 머리글 등)
+CONTAINED_MIN_ROWS = 3       # 앞선 캡쳐의 일부분(잘라낸 캡쳐)으로 보려면 이 이상의 행이 연속으로 같아야 함 (머리글+채플 같은 우연 일치 방지)
+
+CaptureFingerprint = namedtuple("CaptureFingerprint", ["digest", "image_hash", "rows", "height"])
+RowFingerprint = namedtuple("RowFingerprint", ["top", "bottom", "hash", "thumb"])
+# action: "ocr"(전체) / "crop"(start_y 아래만) / "skip"(OCR 생략), reason: 사람이 읽을 설명
+CapturePlan = namedtuple("CapturePlan", ["action", "start_y", "duplicate_of", "overlap_rows", "reason"])
+
+
+def dhash(gray, size, margin=HASH_MARGIN):
+    """흑백 배열 → dHash 정수. 가로 인접 픽셀이 margin보다 밝아지는/어두워지는 위치를 각각 1비트로"""
+    w, h = size
+    small = np.asarray(Image.fromarray(gray).resize((w + 1, h), Image.Resampling.BILINEAR), dtype=np.int16)
+    diff = small[:, 1:] - small[:, :-1]
+    bits = np.concatenate([(diff > margin).ravel(), (diff < -margin).ravel()])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _thumb(gray):
+    return np.asarray(Image.fromarray(gray).resize(ROW_THUMB_SIZE, Image.Resampling.BOX), dtype=np.uint8)
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def fingerprint_capture(image_bytes):
+    """업로드 한 장의 지문: 바이트 해시, 전체 dHash, 표 행별 (top, bottom, dHash)"""
+    with metrics.timer("fingerprint"):
+        img = load_resized_gray(image_bytes)
+        gray = np.asarray(img, dtype=np.uint8)
+        rows = [RowFingerprint(int(top), int(bottom), dhash(gray[top:bottom], ROW_HASH_SIZE), _thumb(gray[top:bottom]))
+                for top, bottom in detect_table_rows(img)]
+        return CaptureFingerprint(hashlib.sha256(image_bytes).hexdigest(), dhash(gray, IMAGE_HASH_SIZE), rows, gray.shape[0])
+
+
+def _rows_match(a, b):
+    """지문이 가까우면 썸네일 픽셀 비교로 확정"""
+    if hamming(a.hash, b.hash) > ROW_HASH_MAX_BITS: return False
+    changed = np.count_nonzero(np.abs(a.thumb.astype(np.int16) - b.thumb) >= ROW_THUMB_DELTA)
+    return changed <= ROW_THUMB_MAX_PIXELS
+
+
+def is_near_duplicate(a, b):
+    """같은 화면인지: 전체 지문이 가깝고 표의 모든 행이 1:1로 같아야 함 (행이 없으면 전체 지문만으로는 판단하지 않음)"""
+    if a.digest == b.digest: return True
+    if hamming(a.image_hash, b.image_hash) > IMAGE_HASH_MAX_BITS: return False
+    if len(a.rows) < OVERLAP_MIN_ROWS or len(a.rows) != len(b.rows): return False
+    return all(_rows_match(x, y) for x, y in zip(a.rows, b.rows))
+
+
+def is_contained(part, whole):
+    """part의 모든 행이 whole의 연속된 행과 같은지 (앞선 캡쳐의 위쪽/가운데만 다시 캡쳐한 경우)"""
+    n = len(part.rows)
+    if n < CONTAINED_MIN_ROWS or n > len(whole.rows): return False
+    return any(all(_rows_match(x, y) for x, y in zip(part.rows, whole.rows[start:start + n]))
+               for start in range(len(whole.rows) - n + 1))
+
+
+def find_overlap(prev, cur):
+    """prev의 마지막 k행 == cur의 (머리글 뒤) 처음 k행인 가장 긴 k. (k, cur에서 마지막으로 겹친 행 인덱스) 또는 None"""
+    for k in range(min(len(prev.rows), len(cur.rows)), OVERLAP_MIN_ROWS - 1, -1):
+        tail = prev.rows[-k:]
+        for skip in range(0, min(OVERLAP_MAX_HEADER_ROWS, len(cur.rows) - k) + 1):
+            if all(_rows_match(x, y) for x, y in zip(tail, cur.rows[skip:skip + k])):
+                return k, skip + k - 1
+    return None
+
+
+def plan_captures(fingerprints):
+    """업로드 순서대로 CapturePlan 리스트 (앞선 이미지와 같으면 skip, 직전에 남긴 캡쳐와 겹치면 crop)"""
+    plans = []
+    kept = []  # (인덱스, 지문) — OCR하는 이미지
+    for i, fp in enumerate(fingerprints):
+        dup = next((j for j, other in kept if is_near_duplicate(fp, other)), None)
+        contained = None if dup is not None else next((j for j, other in kept if is_contained(fp, other)), None)
+        if contained is not None:
+            plans.append(CapturePlan("skip", None, contained, len(fp.rows), f"{contained + 1}번째 이미지에 모두 포함된 화면"))
+            metrics.incr("captures_duplicate")
+            continue
+        if dup is not None:
+            same = "같은 파일" if fingerprints[dup].digest == fp.digest else "같은 화면"
+            plans.append(CapturePlan("skip", None, dup, len(fp.rows), f"{dup + 1}번째 이미지와 {same}"))
+            metrics.incr("captures_duplicate")
+            continue
+
+        # 직전에 OCR한 캡쳐와 이어지는지 (사이에 중복으로 건너뛴 업로드가 있어도 마지막으로 남긴 이미지 기준)
+        prev = kept[-1] if kept else None
+        overlap = find_overlap(prev[1], fp) if prev else None
+        if overlap is not None:
+            k, last = overlap
+            plans.append(CapturePlan("crop", fp.rows[last].bottom, prev[0], k, f"{prev[0] + 1}번째 이미지와 {k}행 겹침"))
+            metrics.incr("captures_overlap_rows", k)
+        else:
+            plans.append(CapturePlan("ocr", 0, None, 0, ""))
+        kept.append((i, fp))
+    return plans
+
+
+def plan_uploads(images_bytes):
+    """이미지 바이트 리스트 → CapturePlan 리스트 (지문 계산 실패한 이미지는 그대로 OCR)"""
+    fingerprints = []
+    for data in images_bytes:
+        try:
+            fingerprints.append(fingerprint_capture(data))
+        except Exception:
+            fingerprints.append(CaptureFingerprint(hashlib.sha256(data).hexdigest(), 0, [], 0))
+    return plan_captures(fingerprints)
@@ -0,0 +1,248 @@
+import re
+from collections import Counter, deque, namedtuple
+
+# --- 강의명 분류용 매칭 인덱스 ---
+# classify_course_logic이 OCR 한 줄마다 area_courses / major_required / major_elective 전체를
+# normalize_string으로 다시 돌리던 것을, (년도, 버전, 전공) 단위로 한 번만 만들어 두는 Aho-Corasick 자동자로 대체합니다.
+# FuzzyCourseIndex는 OCR로 한두 글자가 틀린 강의명을 가장 가까운 정식 강의명으로 되돌리는 근사 매칭 인덱스입니다.
+
+
+def normalize_string(s):
+    if not isinstance(s, str): return ""
+    return re.sub(r'[^가-힣a-zA-Z0-9]', '', s).upper()
+
+
+def clean_course_name(s):
+    """표시용 강의명: 괄호류 제거 + 연속 공백 축소 (OCR 줄 파싱과 같은 규칙)"""
+    s = re.sub(r'[()\[\]{}]', '', s)
+    return re.sub(r'\s+', ' ', s).strip()
+
+
+# 매칭 결과: ftype(이수구분), pattern(매칭된 원본 강의명/키워드), rule(어느 규칙에서 걸렸는지)
+CourseMatch = namedtuple("CourseMatch", ["ftype", "pattern", "rule"])
+
+FALLBACK_MATCH = CourseMatch("교양/기타", None, None)
+
+# 기존 classify_course_logic과 동일한 우선순위 키워드
+LEADERSHIP_KEYWORDS = ["RC", "리더십"]
+CLINICAL_KEYWORDS = ["임상실습", "임상병리사"]
+
+
+class CourseIndex:
+    """정규화된 강의명 패턴을 우선순위 순서대로 담은 Aho-Corasick 매칭 인덱스"""
+
+    def __init__(self, entries):
+        # entries: (원본 패턴, 이수구분, 규칙명) 리스트. 앞에 올수록 우선순위가 높습니다.
+        self.matches = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]  # 노드에서 끝나는 패턴 중 가장 우선순위가 높은 id
+
+        for pattern, ftype, rule in entries:
+            norm = normalize_string(pattern)
+            if not norm: continue  # 빈 패턴은 모든 문자열에 매칭되므로 제외
+            pid = len(self.matches)
+            self.matches.append(CourseMatch(ftype, pattern, rule))
+            self._insert(norm, pid)
+        self._build_fail_links()
+
+    @classmethod
+    def from_db(cls, db, year, version, dept):
+        """requirements.json DB에서 (년도, 버전, 전공)에 해당하는 인덱스 생성"""
+        entries = []
+        # 1. 교양 영역 (area_courses, JSON 순서 유지)
+        for area_name, course_list in db.get("area_courses", {}).items():
+            for area_c in course_list:
+                entries.append((area_c, f"교양({area_name})", f"area_courses/{area_name}"))
+        # 2. RC/리더십 예외 처리
+        for kw in LEADERSHIP_KEYWORDS:
+            entries.append((kw, "교양(리더십)", "leadership_keyword"))
+
+        try:
+            known = db[year][version][dept].get("known_courses", {})
+        except (KeyError, TypeError, AttributeError):
+            known = None
+
+        if known is not None:
+            # 3. 전공 필수 / 4. 전공 선택
+            for req in known.get("major_required", []):
+                entries.append((req, "전공필수", "major_required"))
+            for sel in known.get("major_elective", []):
+                entries.append((sel, "전공선택", "major_elective"))
+            # 5. 임상실습 키워드 강제 매칭 (보조 장치)
+            for kw in CLINICAL_KEYWORDS:
+                entries.append((kw, "전공선택", "clinical_keyword"))
+        return cls(entries)
+
+    def _insert(self, norm, pid):
+        node = 0
+        for ch in norm:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+            node = nxt
+        if self._out[node] is None or pid < self._out[node]:
+            self._out[node] = pid
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                # 접미사 노드의 출력까지 합쳐 두면 탐색 시 fail 체인을 따라갈 필요가 없습니다.
+                suffix_out = self._out[self._fail[nxt]]
+                if suffix_out is not None and (self._out[nxt] is None or suffix_out < self._out[nxt]):
+                    self._out[nxt] = suffix_out
+
+    def match_normalized(self, norm_name):
+        """이미 정규화된 강의명을 한 번 훑어서 가장 우선순위가 높은 매칭을 반환"""
+        goto, fail, out = self._goto, self._fail, self._out
+        best = None
+        node = 0
+        for ch in norm_name:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            pid = out[node]
+            if pid is not None and (best is None or pid < best):
+                best = pid
+                if best == 0: break
+        return self.matches[best] if best is not None else FALLBACK_MATCH
+
+    def match(self, course_name):
+        return self.match_normalized(normalize_string(course_name))
+
+    def classify(self, course_name):
+        return self.match(course_name).ftype
+
+
+# --- OCR 오타 보정용 근사 매칭 ---
+# 한글 음절을 초성/중성/종성 자모로 풀어서 비교합니다. "험"→"헙"처럼 OCR이 음절 하나를 틀려도 자모 1~2개 차이로 잡힙니다.
+# 후보는 자모 바이그램 역색인으로 추려 공유 바이그램이 많은 순서로 편집 거리를 계산하고,
+# 편집 1번은 바이그램을 최대 2개만 깨뜨리므로 (공유 개수로 본) 거리 하한이 현재 최선보다 크면 바로 멈춥니다.
+
+FuzzyMatch = namedtuple("FuzzyMatch", ["name", "distance", "score"])
+
+# 자동 교정 기준: 자모 편집 거리가 길이의 12% 이하(최소 1)이고, 두 번째 후보보다 확실히 가까울 때만
+AUTOCORRECT_RATIO = 0.12
+
+
+def to_jamo(s):
+    """한글 음절 → 초성/중성/종성 자모 문자열 (그 외 문자는 그대로)"""
+    out = []
+    for ch in s:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(chr(0x1100 + code // 588))
+            out.append(chr(0x1161 + (code % 588) // 28))
+            if code % 28: out.append(chr(0x11A7 + code % 28))
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _bigrams(s):
+    s = f"^{s}$"
+    return [s[i:i + 2] for i in range(len(s) - 1)]
+
+
+def bounded_levenshtein(a, b, bound):
+    """편집 거리 (bound를 넘는 것이 확실해지면 bound + 1 반환)"""
+    if abs(len(a) - len(b)) > bound: return bound + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        left = i
+        for j, cb in enumerate(b, 1):
+            left = min(prev[j] + 1, left + 1, prev[j - 1] + (ca != cb))
+            cur.append(left)
+        if min(cur) > bound: return bound + 1
+        prev = cur
+    return prev[-1]
+
+
+class FuzzyCourseIndex:
+    """정식 강의명 목록에 대한 자모 바이그램 근사 매칭 인덱스"""
+
+    def __init__(self, names):
+        self.names = []    # 정식 강의명 (원본 표기)
+        self._keys = []    # 정규화 + 자모 분해된 키
+        self._exact = {}   # 정규화 강의명 → id
+        self._postings = {}
+        for name in names:
+            norm = normalize_string(name)
+            if not norm or norm in self._exact: continue
+            nid = len(self.names)
+            self._exact[norm] = nid
+            self.names.append(name)
+            key = to_jamo(norm)
+            self._keys.append(key)
+            for gram in set(_bigrams(key)):
+                self._postings.setdefault(gram, []).append(nid)
+
+    @classmethod
+    def from_requirements(cls, area_courses, major_required=(), major_elective=(), keywords=()):
+        """교양 영역 강의 + 해당 전공의 전공필수/전공선택 강의명 (+ 필수교양 키워드)으로 생성"""
+        names = [name for courses in area_courses.values() for name in courses]
+        return cls(names + list(major_required) + list(major_elective) + list(keywords))
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, course_name, max_distance=None):
+        """가장 가까운 정식 강의명 FuzzyMatch (max_distance 안에 후보가 없으면 None)"""
+        return next(iter(self._nearest(course_name, max_distance, 1)), None)
+
+    def _nearest(self, course_name, max_distance, limit):
+        norm = normalize_string(course_name)
+        if not norm: return []
+        nid = self._exact.get(norm)
+        if nid is not None:
+            return [FuzzyMatch(self.names[nid], 0, 1.0)]
+
+        key = to_jamo(norm)
+        if max_distance is None: max_distance = max(3, len(key) // 3)
+        grams = set(_bigrams(key))
+        shared = Counter()
+        for gram in grams:
+            for cid in self._postings.get(gram, ()):
+                shared[cid] += 1
+
+        found = []
+        bound = max_distance
+        for cid, n_shared in shared.most_common():
+            if (len(grams) - n_shared + 1) // 2 > bound: break  # 이후 후보는 공유가 더 적으므로 모두 bound 초과
+            cand = self._keys[cid]
+            d = bounded_levenshtein(key, cand, bound)
+            if d > bound: continue
+            found.append(FuzzyMatch(self.names[cid], d, round(1 - d / max(len(key), len(cand)), 3)))
+            if len(found) >= limit:
+                found.sort(key=lambda m: (m.distance, -m.score))
+                del found[limit:]
+                bound = found[-1].distance  # 동률 후보까지는 계속 확인
+        found.sort(key=lambda m: (m.distance, -m.score))
+        return found[:limit]
+
+    def correct(self, course_name):
+        """확신할 수 있을 때만 정식 강의명(표시용)으로 교정, 아니면 원래 이름 그대로"""
+        norm = normalize_string(course_name)
+        if not norm or norm in self._exact: return course_name
+        limit = max(1, int(len(to_jamo(norm)) * AUTOCORRECT_RATIO))
+        found = self._nearest(course_name, limit + 1, 2)
+        if not found or found[0].distance > limit: return course_name
+        if len(found) > 1 and found[1].distance <= found[0].distance: return course_name  # 동률이면 판단 보류
+        # "임상화학및실험2" → "임상화학및실험1"처럼 번호만 다른 것은 목록에 없는 실제 강의일 수 있으므로 교정하지 않음:
+        # 번호(숫자)는 그대로이고 한글/영문 글자가 하나 이상 달라야 OCR 오타로 봄
+        target = normalize_string(found[0].name)
+        if re.findall(r'\d+', norm) != re.findall(r'\d+', target): return course_name
+        if re.sub(r'\d', '', norm) == re.sub(r'\d', '', target): return course_name
+        return clean_course_name(found[0].name)
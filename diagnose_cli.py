@@ -0,0 +1,222 @@
+"""졸업요건 일괄 진단 CLI (Streamlit 없이 실행)
+
+입력 (여러 개 지정 가능):
+  - JSONL 파일 또는 '-'(표준입력): 한 줄에 학생 한 명
+  - JSON 파일: 학생 한 명(객체) 또는 여러 명(리스트)
+  - 디렉터리: 안의 .json/.jsonl 파일과, 캡쳐 이미지가 들어 있는 하위 폴더(폴더 하나 = 학생 한 명, OCR 수행)
+  - 성적증명서 PDF 파일 (파일 하나 = 학생 한 명, 텍스트 레이어에서 바로 읽고 스캔 쪽만 OCR). 하위 폴더 안의 PDF도 함께 읽습니다.
+
+학생 형식: {"student_id": "...", "year": "2021", "version": "졸업요건 기준", "dept": "임상병리학과",
+           "courses": [{"강의명": "...", "학점": 3, "이수구분": "전공필수"}, ...]}
+year/version/dept가 없으면 명령행 옵션 값을 쓰고, 이수구분이 없는 강의는 자동 분류합니다.
+
+예: python diagnose_cli.py transcripts/ -o report.jsonl --year 2021 --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+from diagnosis import diagnose
+from requirements_model import load_catalog
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+PDF_EXTENSIONS = ('.pdf',)
+
+_catalog = None
+
+
+def _init_worker(requirements_path):
+    # 워커 프로세스마다 한 번만 컴파일
+    global _catalog
+    _catalog = load_catalog(requirements_path)
+
+
+def iter_transcripts(inputs, defaults):
+    """입력 경로들에서 학생 단위 transcript dict를 순서대로 생성"""
+    for path in inputs:
+        if path == '-':
+            yield from _iter_jsonl(sys.stdin, '<stdin>', defaults)
+        elif os.path.isdir(path):
+            yield from _iter_directory(path, defaults)
+        elif path.endswith('.jsonl'):
+            with open(path, 'r', encoding='utf-8') as f:
+                yield from _iter_jsonl(f, path, defaults)
+        elif path.lower().endswith(PDF_EXTENSIONS):
+            yield _with_defaults({"images": [path]}, defaults, os.path.splitext(os.path.basename(path))[0])
+        else:
+            yield from _iter_json_file(path, defaults)
+
+
+def _with_defaults(item, defaults, fallback_id):
+    transcript = dict(defaults)
+    transcript.update({k: v for k, v in item.items() if v is not None})
+    transcript.setdefault("student_id", fallback_id)
+    return transcript
+
+
+def _not_object(student_id, item):
+    # 학생 항목이 객체가 아니면 (예: [1, 2], "x", 3) 그 항목만 오류로 기록
+    return {"student_id": student_id, "error": f"학생 항목이 객체가 아님: {json.dumps(item, ensure_ascii=False)[:80]}"}
+
+
+def _iter_jsonl(stream, name, defaults):
+    for lineno, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line: continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield {"student_id": f"{name}:{lineno}", "error": f"JSON 파싱 실패: {e}"}
+            continue
+        if not isinstance(item, dict):
+            yield _not_object(f"{name}:{lineno}", item)
+            continue
+        yield _with_defaults(item, defaults, f"{name}:{lineno}")
+
+
+def _iter_json_file(path, defaults):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        yield {"student_id": path, "error": f"파일 읽기 실패: {e}"}
+        return
+    items = data if isinstance(data, list) else [data]
+    base = os.path.splitext(os.path.basename(path))[0]
+    for i, item in enumerate(items):
+        student_id = base if len(items) == 1 else f"{base}:{i}"
+        yield _with_defaults(item, defaults, student_id) if isinstance(item, dict) else _not_object(student_id, item)
+
+
+def _iter_directory(path, defaults):
+    for name in sorted(os.listdir(path)):
+        full = os.path.join(path, name)
+        if os.path.isdir(full):
+            images = sorted(os.path.join(full, f) for f in os.listdir(full) if f.lower().endswith(IMAGE_EXTENSIONS + PDF_EXTENSIONS))
+            if images:
+                yield _with_defaults({"images": images}, defaults, name)
+        elif name.lower().endswith(PDF_EXTENSIONS):
+            yield _with_defaults({"images": [full]}, defaults, os.path.splitext(name)[0])
+        elif name.endswith('.jsonl'):
+            with open(full, 'r', encoding='utf-8') as f:
+                yield from _iter_jsonl(f, full, defaults)
+        elif name.endswith('.json'):
+            yield from _iter_json_file(full, defaults)
+
+
+def diagnose_transcript(transcript):
+    """학생 한 명 진단 → 리포트 dict (오류는 "error" 필드로 기록)"""
+    student_id = transcript.get("student_id")
+    if "error" in transcript:
+        return transcript
+    year, version, dept = transcript.get("year"), transcript.get("version"), transcript.get("dept")
+    try:
+        criteria = _catalog.get(year, version, dept)
+    except TypeError:  # year/version/dept에 리스트/객체가 들어온 경우
+        criteria = None
+    if criteria is None:
+        return {"student_id": student_id, "error": f"졸업요건 없음: {year}/{version}/{dept}"}
+
+    index = criteria.index
+    if "images" in transcript:
+        # 캡쳐 이미지 폴더: 중복/겹친 캡쳐 정리 → OCR → 분류 → 채플 제외 중복 제거 (앱과 동일)
+        # PDF는 텍스트 레이어에서 바로 읽고, 스캔 쪽만 이미지로 바꿔 OCR 대상에 넣습니다.
+        import ocr_pipeline
+        from capture_dedup import plan_uploads
+        import pdf_transcript
+        paths = transcript["images"]
+        if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+            return {"student_id": student_id, "error": "images는 파일 경로 리스트여야 합니다"}
+        rows, images = [], []
+        # 없는 파일/권한 오류/깨진 PDF는 이 학생만 오류로 기록하고 다음 학생으로 넘어감
+        try:
+            for path in paths:
+                if path.lower().endswith(PDF_EXTENSIONS):
+                    try:
+                        pdf_rows, scanned = pdf_transcript.read_transcript(path, index.classify)
+                    except pdf_transcript.PdfReadError as e:
+                        return {"student_id": student_id, "error": f"{os.path.basename(path)}: {e}"}
+                    rows.extend(pdf_rows)
+                    images.extend(scanned)
+                else:
+                    images.append(ocr_pipeline.read_image_bytes(path))
+        except OSError as e:
+            return {"student_id": student_id, "error": f"파일 읽기 실패: {e}"}
+        try:
+            for data, plan in zip(images, plan_uploads(images)):
+                if plan.action == "skip": continue
+                rows.extend(ocr_pipeline.ocr_image_parsing(data, index.classify, start_y=plan.start_y))
+        except (OSError, ValueError) as e:  # PIL 디코딩 오류(UnidentifiedImageError는 OSError)
+            return {"student_id": student_id, "error": f"이미지 분석 실패: {e}"}
+        # ocr_image_parsing은 실패해도 빈 리스트를 돌려주므로, 아무 강의도 얻지 못했으면 "미충족"이 아니라 오류로 기록
+        if not rows:
+            return {"student_id": student_id, "error": f"인식된 강의 없음: 입력 {len(transcript['images'])}개 (OCR 실패 또는 빈 이미지)"}
+        courses = ocr_pipeline.dedupe_courses(rows)
+    else:
+        courses = None
+
+    try:
+        if courses is None:
+            entries = transcript.get("courses", [])
+            if not isinstance(entries, list):
+                return {"student_id": student_id, "error": "courses는 강의 객체 리스트여야 합니다"}
+            courses = []
+            for i, c in enumerate(entries):
+                if not isinstance(c, dict):
+                    return {"student_id": student_id, "error": f"{i}번째 강의 항목이 객체가 아님: {json.dumps(c, ensure_ascii=False)[:80]}"}
+                name = str(c.get("강의명", "")).strip()
+                courses.append({
+                    "강의명": name,
+                    "학점": float(c.get("학점", 0) or 0),
+                    "이수구분": c.get("이수구분") or index.classify(name),
+                })
+        report = diagnose(courses, criteria)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"student_id": student_id, "error": f"진단 실패: {e}"}
+    return {"student_id": student_id, "year": year, "version": version, "dept": dept,
+            "n_courses": len(courses), **report}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="졸업요건 일괄 진단 (JSONL 리포트 출력)")
+    parser.add_argument("inputs", nargs="+", help="JSONL/JSON 파일, 성적증명서 PDF, 디렉터리, 또는 '-'(표준입력)")
+    parser.add_argument("-o", "--output", default="-", help="리포트 JSONL 경로 (기본: 표준출력)")
+    parser.add_argument("--requirements", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "requirements.json"))
+    parser.add_argument("--year")
+    parser.add_argument("--version", default="졸업요건 기준")
+    parser.add_argument("--dept", default="임상병리학과")
+    parser.add_argument("--workers", type=int, default=1, help="병렬 프로세스 수 (기본 1)")
+    args = parser.parse_args(argv)
+
+    defaults = {k: v for k, v in (("year", args.year), ("version", args.version), ("dept", args.dept)) if v}
+    transcripts = iter_transcripts(args.inputs, defaults)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    n_total = n_pass = n_error = 0
+    try:
+        if args.workers > 1:
+            pool = Pool(args.workers, initializer=_init_worker, initargs=(args.requirements,))
+            reports = pool.imap(diagnose_transcript, transcripts, chunksize=8)
+        else:
+            pool = None
+            _init_worker(args.requirements)
+            reports = map(diagnose_transcript, transcripts)
+
+        for report in reports:
+            out.write(json.dumps(report, ensure_ascii=False) + "\n")
+            n_total += 1
+            if "error" in report: n_error += 1
+            elif report["is_all_pass"]: n_pass += 1
+        if pool is not None:
+            pool.close(); pool.join()
+    finally:
+        if out is not sys.stdout: out.close()
+
+    print(f"진단 완료: {n_total}명 (충족 {n_pass}, 미충족 {n_total - n_pass - n_error}, 오류 {n_error})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
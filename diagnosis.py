@@ -0,0 +1,233 @@
+import math
+from collections import Counter, namedtuple
+
+from course_index import normalize_string
+from requirements_model import RequirementSet
+
+# --- 졸업요건 진단 로직 ---
+# Streamlit과 무관한 순수 로직입니다. app.py(tab2)와 diagnose_cli.py가 함께 사용합니다.
+# DiagnosisState는 강의(행)별 기여분을 기억해 두고, 에디터에서 행이 추가/수정/삭제되면 그 행의 기여분만 빼고 더합니다.
+
+# 자연과우주, 생명과환경, 정보와기술을 제외한 7개 핵심 영역 (7개 중 5개 필수)
+TARGET_AREAS = ["문학과예술", "인간과역사", "언어와표현", "가치와윤리", "국가와사회", "지역과세계", "체육과건강"]
+REQUIRED_CORE_COUNT = 5
+
+BASIC_COURSES = ["인체해부학", "의학용어", "해부학", "세포생물학", "병리학", "미생물학", "조직학"]
+ADVANCED_WORK_KEYWORDS = ["진단", "종합설계", "임상실습"]
+CAREER_DESIGN_KEYWORDS = ["진로지도", "진로설계"]
+CAREER_DEV_KEYWORDS = ["커리어디자인", "산업과기업의이해", "공공기관의이해"]
+NORM_CAREER_DEV_KEYWORDS = [normalize_string(kw) for kw in CAREER_DEV_KEYWORDS]
+# 아래에서 개별적으로 정밀하게 체크하는 필수교양 항목
+SEPARATELY_CHECKED = ["리더십", "진로경력", "대학학문"]
+
+# 강의 한 행이 진단 결과에 기여하는 내용 (행의 (강의명, 학점, 이수구분)만으로 결정됨)
+RowContribution = namedtuple("RowContribution", [
+    "name", "credit", "bucket", "advanced", "leadership", "area",
+    "career_design", "career_dev", "univ_world", "required_items", "major_cores",
+])
+
+
+def _text(value):
+    # 에디터에서 새로 추가된 빈 칸(None/NaN)은 빈 문자열로 취급
+    if value is None or (isinstance(value, float) and math.isnan(value)): return ""
+    return str(value)
+
+
+def _credit(value):
+    try:
+        credit = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(credit) else credit
+
+
+def row_key(course):
+    """행 식별용 키 (강의명, 학점, 이수구분) — 같은 키의 행은 기여분도 같음"""
+    return (_text(course.get('강의명')), _credit(course.get('학점')), _text(course.get('이수구분')))
+
+
+class DiagnosisState:
+    """졸업요건 진단의 증분 계산 상태
+
+    sync(courses)로 현재 강의 목록을 넘기면 이전 목록과 비교해 바뀐 행만 반영하고,
+    report()는 diagnose()와 같은 형식의 결과 dict를 돌려줍니다.
+    """
+
+    def __init__(self, criteria):
+        if not isinstance(criteria, RequirementSet):
+            criteria = RequirementSet(None, None, None, criteria)
+        self.criteria = criteria
+        # 검사 대상 필수교양 (위에서 개별 체크하는 항목 제외)
+        self._required_items = [item for item in criteria.required_courses if item.name not in SEPARATELY_CHECKED]
+        self._contributions = {}   # row_key → RowContribution (정규화/키워드 검사 결과 메모, 현재 행만 보관)
+        self._rows = Counter()     # 현재 반영된 row_key 개수
+        self._order = []           # 현재 행 순서 (심화 강의 목록 출력용)
+
+        self._credits = {"total": Counter(), "전공필수": Counter(), "전공선택": Counter(), "advanced": Counter()}
+        self._areas = Counter()
+        self._leadership = 0
+        self._career_design = 0
+        self._career_dev = Counter()
+        self._univ_world = 0
+        self._required_hits = Counter()
+        self._major_core_hits = Counter()
+
+    # --- 행 단위 계산 ---
+    def _contribution(self, key):
+        contrib = self._contributions.get(key)
+        if contrib is not None: return contrib
+
+        raw_name, credit, raw_type = key
+        c_name = raw_name.strip()
+        c_type = raw_type.strip()
+        norm_name = normalize_string(c_name)
+
+        # 사용자가 테이블에서 선택한 '이수구분'을 최우선으로 반영
+        bucket = c_type if c_type in ("전공필수", "전공선택") else None
+
+        # 심화 학점 판정
+        is_advanced_by_key = any(kw in norm_name for kw in self.criteria.advanced_keywords)
+        is_major = "전공" in c_type
+        is_basic = c_name in BASIC_COURSES
+        is_advanced_work = any(word in c_name for word in ADVANCED_WORK_KEYWORDS)
+        advanced = is_advanced_by_key or (is_major and not (is_basic and not is_advanced_work))
+
+        # "교양(문학과예술)" -> "문학과예술"만 추출
+        area = raw_type.split('(')[1].replace(')', '') if "교양(" in raw_type else None
+
+        contrib = RowContribution(
+            name=c_name,
+            credit=credit,
+            bucket=bucket,
+            advanced=advanced,
+            leadership="리더십" in raw_type or "RC" in norm_name,
+            area=area,
+            career_design=any(kw in norm_name for kw in CAREER_DESIGN_KEYWORDS),
+            career_dev=tuple(i for i, kw in enumerate(NORM_CAREER_DEV_KEYWORDS) if kw in norm_name),
+            univ_world="대학학문의세계" in norm_name,
+            required_items=tuple(i for i, item in enumerate(self._required_items) if item.is_satisfied_by((norm_name,))),
+            # "면역혈액" 처럼 핵심 단어(앞 4글자)가 포함되고 이수구분이 전공필수인 경우만 인정
+            major_cores=tuple(i for i, (_, core) in enumerate(self.criteria.major_required_core) if core in norm_name)
+                        if raw_type == "전공필수" else (),
+        )
+        self._contributions[key] = contrib
+        return contrib
+
+    def _apply(self, key, sign):
+        c = self._contribution(key)
+        self._rows[key] += sign
+        if self._rows[key] == 0:
+            # 에디터에서 입력 중인 중간 값마다 메모가 쌓이지 않도록 마지막 행이 빠지면 메모도 버림
+            del self._rows[key]
+            del self._contributions[key]
+
+        self._credits["total"][c.credit] += sign
+        if c.bucket: self._credits[c.bucket][c.credit] += sign
+        if c.advanced: self._credits["advanced"][c.credit] += sign
+        if c.area is not None: self._areas[c.area] += sign
+        self._leadership += sign * c.leadership
+        self._career_design += sign * c.career_design
+        self._univ_world += sign * c.univ_world
+        for i in c.career_dev: self._career_dev[i] += sign
+        for i in c.required_items: self._required_hits[i] += sign
+        for i in c.major_cores: self._major_core_hits[i] += sign
+
+    # --- 행 추가/삭제/수정 ---
+    def sync(self, courses):
+        """현재 강의 목록으로 갱신. 이전 목록과 달라진 행의 기여분만 빼고 더함"""
+        new_order = [row_key(c) for c in courses]
+        new_rows = Counter(new_order)
+        for key, count in (self._rows - new_rows).items():
+            for _ in range(count): self._apply(key, -1)
+        for key, count in (new_rows - self._rows).items():
+            for _ in range(count): self._apply(key, +1)
+        self._order = new_order
+        return self
+
+    def __len__(self):
+        """현재 반영된 행 수 (크기 추정을 다시 할지 판단용)"""
+        return len(self._order)
+
+    # --- 결과 ---
+    def _credit_sum(self, bucket):
+        return sum((credit * count for credit, count in self._credits[bucket].items() if count), 0.0)
+
+    def report(self):
+        criteria = self.criteria
+        req_fail = []
+
+        # [영역 판정 로직] 7개 핵심 영역 중 5개 필수
+        satisfied_core_areas = sorted(area for area, n in self._areas.items() if n > 0 and area in TARGET_AREAS)
+        if len(satisfied_core_areas) < REQUIRED_CORE_COUNT:
+            areas_str = ", ".join(satisfied_core_areas) if satisfied_core_areas else "없음"
+            req_fail.append(
+                f"교양 이수영역 선택 미달: 핵심 7개 영역 중 {len(satisfied_core_areas)}/{REQUIRED_CORE_COUNT}개 이수 "
+                f"(완료 영역: {areas_str})"
+            )
+
+        total_sum = self._credit_sum("total")
+        maj_req = self._credit_sum("전공필수")
+        maj_sel = self._credit_sum("전공선택")
+        advanced_sum = self._credit_sum("advanced")
+        maj_total_sum = maj_req + maj_sel
+        detected_advanced = [c.name for c in map(self._contribution, self._order) if c.advanced]
+
+        # 리더십 체크
+        leadership_count = self._leadership
+        if leadership_count < 2:
+            req_fail.append(f"리더십(개발/실습) ({leadership_count}/2강의 이수)")
+
+        if self._career_design == 0:
+            req_fail.append("RC진로설계 (임상병리사진로지도)")
+
+        # RC경력개발 체크 (3개 중 2개 필수): 키워드가 포함된 서로 다른 강의 수를 카운트
+        dev_count = sum(1 for i in range(len(CAREER_DEV_KEYWORDS)) if self._career_dev[i] > 0)
+        if dev_count < 2:
+            req_fail.append(f"RC경력개발 ({dev_count}/2개 이수 중)")
+
+        # 대학학문의세계 체크 (1개 필수)
+        if self._univ_world == 0:
+            req_fail.append("대학학문의세계")
+
+        # 기타 JSON 정의 필수교양 체크
+        for i, item in enumerate(self._required_items):
+            if self._required_hits[i] == 0:
+                req_fail.append(item.name)
+
+        # 전공필수 과목 체크 (키워드 매칭 + 이수구분 확인)
+        for i, (mr_course, _) in enumerate(criteria.major_required_core):
+            if self._major_core_hits[i] == 0:
+                req_fail.append(f"전공필수({mr_course})")
+
+        # 최종 판정 로직
+        pass_total = total_sum >= criteria.total_credits
+        pass_major_total = maj_total_sum >= criteria.major_total
+        pass_major_req = maj_req >= criteria.major_required_credits
+        pass_advanced = advanced_sum >= criteria.advanced_course
+        pass_req_courses = len(req_fail) == 0
+
+        return {
+            "total_sum": total_sum,
+            "maj_req": maj_req,
+            "maj_sel": maj_sel,
+            "maj_total_sum": maj_total_sum,
+            "advanced_sum": advanced_sum,
+            "detected_advanced": detected_advanced,
+            "leadership_count": leadership_count,
+            "satisfied_core_areas": satisfied_core_areas,
+            "req_fail": req_fail,
+            "pass_total": pass_total,
+            "pass_major_total": pass_major_total,
+            "pass_major_req": pass_major_req,
+            "pass_advanced": pass_advanced,
+            "pass_req_courses": pass_req_courses,
+            "is_all_pass": all([pass_total, pass_major_total, pass_major_req, pass_advanced, pass_req_courses]),
+        }
+
+
+def diagnose(courses, criteria):
+    """수강 강의 목록({"강의명", "학점", "이수구분"} 리스트)과 졸업요건(RequirementSet)으로 진단 결과 dict 반환
+
+    criteria로 db[년도][버전][전공] 원본 dict를 넘기면 그 자리에서 컴파일해서 사용합니다.
+    """
+    return DiagnosisState(criteria).sync(courses).report()
@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+# --- 단계별 처리 시간 계측 ---
+# OCR 파이프라인 각 단계(디코딩, 보정, tesseract, 줄 파싱, 분류, 진단)의 소요 시간과 줄/캐시 카운터를 모읍니다.
+# 측정값은 프로세스 메모리의 링 버퍼(최근 N건)에만 보관하고, JSON / Prometheus 텍스트로 내보낼 수 있습니다.
+# APP_METRICS=1 일 때만 켜지며, 꺼져 있으면 timer()는 아무 일도 하지 않는 공용 컨텍스트를 돌려줍니다.
+#
+# 환경변수
+#   APP_METRICS=1            계측 켜기 (기본 꺼짐)
+#   APP_METRICS_BUFFER=2000  단계별 보관할 최근 측정 수
+#   APP_METRICS_FILE=경로     export_to_file() 기본 경로 (.prom이면 Prometheus 텍스트, 그 외 JSON)
+#   APP_METRICS_PORT=9108    지정하면 http://127.0.0.1:포트/metrics 로 Prometheus 텍스트 제공
+
+DEFAULT_BUFFER_SIZE = 2000
+PERCENTILES = (50, 95)
+
+_NULL_TIMER = nullcontext()
+
+
+def _env_flag(name):
+    return os.environ.get(name, "0").lower() not in ("", "0", "false", "no")
+
+
+class Metrics:
+    """단계별 소요 시간 링 버퍼 + 누적 카운터 (스레드 안전)"""
+
+    def __init__(self, enabled=False, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.enabled = enabled
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._samples = {}   # stage → deque[초]
+        self._totals = {}    # stage → [누적 횟수, 누적 초] (링 버퍼에서 밀려난 것 포함)
+        self._counters = {}
+        self._gauges = {}
+        self.started = time.time()
+
+    # --- 기록 ---
+    def observe(self, stage, seconds):
+        if not self.enabled: return
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.buffer_size)
+                self._totals[stage] = [0, 0.0]
+            samples.append(seconds)
+            total = self._totals[stage]
+            total[0] += 1
+            total[1] += seconds
+
+    def incr(self, name, n=1):
+        if not self.enabled or not n: return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def set_gauge(self, name, value):
+        """현재 값 기록 (메모리 사용량 등, 누적이 아니라 덮어씀)"""
+        if not self.enabled: return
+        with self._lock:
+            self._gauges[name] = value
+
+    def timer(self, stage):
+        """with metrics.timer("ocr"): ... — 꺼져 있으면 아무 일도 하지 않음"""
+        if not self.enabled: return _NULL_TIMER
+        return self._timer(stage)
+
+    @contextmanager
+    def _timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """함수 데코레이터 버전의 timer (켜짐 여부는 호출할 때마다 확인)"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled: return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._counters.clear()
+            self._gauges.clear()
+            self.started = time.time()
+
+    # --- 조회 ---
+    def summary(self):
+        """{"stages": {stage: {count, total_s, window, mean_ms, p50_ms, p95_ms, max_ms}}, "counters": {...}, "gauges": {...}}"""
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._samples.items()}
+            totals = {stage: list(values) for stage, values in self._totals.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        stages = {}
+        for stage, values in samples.items():
+            values.sort()
+            count, total_s = totals[stage]
+            row = {"count": count, "total_s": round(total_s, 6), "window": len(values),
+                   "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+                   "max_ms": round(values[-1] * 1000, 3) if values else 0.0}
+            for p in PERCENTILES:
+                row[f"p{p}_ms"] = round(_percentile(values, p) * 1000, 3)
+            stages[stage] = row
+        return {"enabled": self.enabled, "since": self.started, "stages": stages, "counters": counters, "gauges": gauges}
+
+    def to_json(self):
+        return json.dumps(self.summary(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix="yonsei_checker"):
+        """Prometheus 텍스트 노출 형식 (단계별 summary + 카운터)"""
+        data = self.summary()
+        out = [f"# HELP {prefix}_stage_seconds 파이프라인 단계별 소요 시간",
+               f"# TYPE {prefix}_stage_seconds summary"]
+        for stage, row in sorted(data["stages"].items()):
+            for p in PERCENTILES:
+                out.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{p / 100:g}"}} {row[f"p{p}_ms"] / 1000:.6f}')
+            out.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {row["total_s"]:.6f}')
+            out.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {row["count"]}')
+        for name, value in sorted(data["counters"].items()):
+            out.append(f"# TYPE {prefix}_{name}_total counter")
+            out.append(f"{prefix}_{name}_total {value}")
+        for name, value in sorted(data["gauges"].items()):
+            out.append(f"# TYPE {prefix}_{name} gauge")
+            out.append(f"{prefix}_{name} {value}")
+        return "\n".join(out) + "\n"
+
+    def export_to_file(self, path=None):
+        """JSON(기본) 또는 Prometheus 텍스트(.prom/.txt)로 저장하고 경로 반환"""
+        path = path or os.environ.get("APP_METRICS_FILE") or "metrics.json"
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return path
+
+
+def _percentile(sorted_values, p):
+    """정렬된 값의 p 백분위수 (선형 보간)"""
+    if not sorted_values: return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+# --- 로컬 HTTP 엔드포인트 (선택) ---
+_server = None
+_server_lock = threading.Lock()
+
+def start_http_server(port, host="127.0.0.1", registry=None):
+    """/metrics(Prometheus), /metrics.json 을 제공하는 데몬 스레드 서버 (프로세스당 한 번만 시작)"""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    registry = registry or metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, ctype = registry.to_json(), "application/json; charset=utf-8"
+            elif self.path.startswith("/metrics"):
+                body, ctype = registry.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                self.send_error(404); return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), Handler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        return _server
+
+
+# 프로세스 전역 레지스트리
+metrics = Metrics(enabled=_env_flag("APP_METRICS"),
+                  buffer_size=int(os.environ.get("APP_METRICS_BUFFER", DEFAULT_BUFFER_SIZE)))
+
+timer = metrics.timer
+timed = metrics.timed
+incr = metrics.incr
+
+if metrics.enabled and os.environ.get("APP_METRICS_PORT"):
+    try:
+        start_http_server(int(os.environ["APP_METRICS_PORT"]))
+    except (OSError, ValueError):
+        pass  # 포트 사용 중(다른 Streamlit 프로세스가 이미 띄움) 등 — 계측 자체는 계속
@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+from collections import namedtuple
+
+import pytesseract
+
+try:  # 선택 의존성: libtesseract를 프로세스 안에서 직접 사용 (pip install tesserocr)
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# --- OCR 엔진(백엔드) ---
+# "pytesseract": 이미지마다 임시 파일을 쓰고 tesseract 프로세스를 새로 띄워 traineddata를 다시 읽습니다 (기존 방식).
+# "tesserocr": 프로세스 안에 tesseract API 핸들을 만들어 두고 계속 재사용합니다. 핸들은 스레드 안전하지 않으므로
+#              풀에서 하나씩 빌려 쓰고 돌려놓습니다 (동시에 쓰는 워커 수만큼만 생성).
+# OCR_BACKEND 환경변수: "auto"(기본, tesserocr가 있으면 사용) / "tesserocr" / "pytesseract"
+
+OCR_LANG = 'kor+eng'
+OCR_PSM = 6  # --psm 6: 하나의 균일한 텍스트 블록
+OCR_OEM = 3  # --oem 3: 기본 엔진
+OCR_CONFIG = f'--psm {OCR_PSM} --oem {OCR_OEM}'
+
+# box: 인식에 사용한 이미지 기준 줄 영역 (left, top, right, bottom). 약한 줄만 다시 OCR할 때 사용
+OCRLine = namedtuple("OCRLine", ["text", "conf", "box"], defaults=(None,))
+
+
+def _config(psm, whitelist):
+    config = f'--psm {psm} --oem {OCR_OEM}'
+    if whitelist: config += f' -c tessedit_char_whitelist={whitelist}'
+    return config
+
+
+class PytesseractBackend:
+    """tesseract CLI를 매번 실행하는 기본 백엔드"""
+    name = "pytesseract"
+
+    def recognize(self, img, psm=OCR_PSM, whitelist=None):
+        """이미지 → OCRLine(text, conf, box) 리스트 (conf는 단어 신뢰도 평균, 0~100, box는 단어 박스의 합)"""
+        data = pytesseract.image_to_data(img, lang=OCR_LANG, config=_config(psm, whitelist), output_type=pytesseract.Output.DICT)
+        lines = {}
+        for i, word in enumerate(data['text']):
+            word = (word or '').strip()
+            if not word: continue
+            line_key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            words, confs, boxes = lines.setdefault(line_key, ([], [], []))
+            words.append(word)
+            left, top = data['left'][i], data['top'][i]
+            boxes.append((left, top, left + data['width'][i], top + data['height'][i]))
+            try:
+                conf = float(data['conf'][i])
+            except (TypeError, ValueError):
+                conf = -1.0
+            if conf >= 0: confs.append(conf)
+
+        result = []
+        for words, confs, boxes in lines.values():
+            conf = sum(confs) / len(confs) if confs else 0.0
+            box = (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+            result.append(OCRLine(" ".join(words), round(conf, 1), box))
+        return result
+
+    def available(self):
+        try:
+            pytesseract.get_tesseract_version()
+            return True
+        except Exception:
+            return False
+
+
+class TesserocrBackend:
+    """tesseract API 핸들을 재사용하는 상주형 백엔드 (kor+eng, --oem 3, --psm 6으로 한 번만 초기화)"""
+    name = "tesserocr"
+
+    def __init__(self, max_engines=None):
+        self.max_engines = max_engines or os.cpu_count() or 1
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._fallback = None  # 엔진 초기화 실패(traineddata 없음 등) 시 pytesseract로 대체
+
+    def _new_engine(self):
+        return tesserocr.PyTessBaseAPI(lang=OCR_LANG, psm=tesserocr.PSM(OCR_PSM), oem=tesserocr.OEM(OCR_OEM))
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.max_engines:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self._new_engine()
+            except Exception:
+                with self._lock: self._created -= 1
+                raise
+        return self._idle.get()  # 모든 핸들이 사용 중이면 반납될 때까지 대기
+
+    def recognize(self, img, psm=OCR_PSM, whitelist=None):
+        if self._fallback is not None:
+            return self._fallback.recognize(img, psm, whitelist)
+        try:
+            api = self._checkout()
+        except RuntimeError:
+            self._fallback = PytesseractBackend()
+            return self._fallback.recognize(img, psm, whitelist)
+        try:
+            # 다시 OCR할 때만 PSM/문자 제한을 바꾸고, 풀에 돌려놓기 전에 기본값으로 되돌림
+            if psm != OCR_PSM: api.SetPageSegMode(tesserocr.PSM(psm))
+            if whitelist: api.SetVariable("tessedit_char_whitelist", whitelist)
+            api.SetImage(img)
+            api.Recognize()
+            result = []
+            level = tesserocr.RIL.TEXTLINE
+            for line in tesserocr.iterate_level(api.GetIterator(), level):
+                text = (line.GetUTF8Text(level) or '').strip()
+                if not text: continue
+                result.append(OCRLine(" ".join(text.split()), round(line.Confidence(level), 1), line.BoundingBox(level)))
+            api.Clear()
+            return result
+        finally:
+            if psm != OCR_PSM: api.SetPageSegMode(tesserocr.PSM(OCR_PSM))
+            if whitelist: api.SetVariable("tessedit_char_whitelist", "")
+            self._idle.put(api)
+
+    def available(self):
+        return tesserocr is not None
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().End()
+            except queue.Empty:
+                break
+        with self._lock: self._created = 0
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    """이름에 맞는 백엔드(프로세스 전역 1개). auto는 tesserocr가 있으면 상주형, 없으면 pytesseract"""
+    name = name or os.environ.get("OCR_BACKEND", "auto")
+    if name == "auto":
+        name = "tesserocr" if tesserocr is not None else "pytesseract"
+    if name == "tesserocr" and tesserocr is None:
+        name = "pytesseract"  # 설치되지 않았으면 기존 방식으로 대체
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = TesserocrBackend() if name == "tesserocr" else PytesseractBackend()
+        return _backends[name]
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# --- OCR 결과 캐시 ---
+# 이미지 바이트 + 전처리/OCR 설정의 해시를 키로, tesseract가 인식한 "원본 텍스트 줄"을 저장합니다.
+# 분류 결과가 아닌 원본 줄을 저장하므로 년도/버전/전공이 바뀌어도 분류 단계만 다시 돌면 됩니다.
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_DISK_ENTRIES = 2048
+
+
+def make_cache_key(image_bytes, config_signature):
+    """이미지 내용과 설정 문자열로 캐시 키(sha256 hex) 생성"""
+    h = hashlib.sha256()
+    h.update(config_signature.encode('utf-8'))
+    h.update(b'\0')
+    h.update(image_bytes)
+    return h.hexdigest()
+
+
+class OCRCache:
+    """메모리 LRU + (선택) 디스크 2단 캐시. 여러 OCR 워커 스레드에서 동시에 사용해도 안전합니다."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, disk_dir=None, max_disk_entries=DEFAULT_MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        lines = self._read_disk(key)
+        with self._lock:
+            if lines is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, lines)
+        return lines
+
+    def put(self, key, lines):
+        lines = list(lines)
+        with self._lock:
+            self._put_memory(key, lines)
+        self._write_disk(key, lines)
+
+    def _put_memory(self, key, lines):
+        self._memory[key] = lines
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(self, key):
+        if not self.disk_dir: return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = json.load(f)
+            os.utime(path)  # 디스크 쪽도 최근 사용 순으로 정리하기 위해 갱신
+            return lines
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, lines):
+        if not self.disk_dir: return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(lines, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except OSError:
+            pass
+
+    def _prune_disk(self):
+        entries = [e for e in os.scandir(self.disk_dir) if e.name.endswith('.json')]
+        if len(entries) <= self.max_disk_entries: return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[:len(entries) - self.max_disk_entries]:
+            try: os.remove(e.path)
+            except OSError: pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    """프로세스 전역 캐시 (Streamlit 재실행/설정 초기화와 무관하게 유지)
+
+    OCR_CACHE_SIZE: 메모리 보관 개수, OCR_CACHE_DIR: 지정 시 디스크에도 저장하여 재시작 후에도 유지
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                max_entries = int(os.environ.get("OCR_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+            except ValueError:
+                max_entries = DEFAULT_MAX_ENTRIES
+            _default_cache = OCRCache(max_entries=max_entries, disk_dir=os.environ.get("OCR_CACHE_DIR") or None)
+        return _default_cache
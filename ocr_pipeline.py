@@ -0,0 +1,617 @@
+import io
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+from PIL import Image, ImageOps, ImageEnhance
+
+from ocr_backends import OCR_CONFIG, OCR_LANG, OCR_PSM, OCRLine, get_backend
+from ocr_cache import OCRCache, get_default_cache, make_cache_key
+from metrics import metrics
+from course_index import clean_course_name
+
+# --- OCR 파이프라인 공용 모듈 ---
+# Streamlit에 의존하지 않는 OCR 관련 헬퍼를 모아 둡니다.
+# 단계: 이미지 → (1) 정규화된 흑백 이미지 → (2) OCR 텍스트 줄(+신뢰도) → (3) (강의명, 학점) 행 → (4) 이수구분 분류
+# (2), (3)은 이미지 해시 기준으로 캐시되므로, 년도/버전/전공을 바꾸면 (4)만 다시 실행됩니다.
+# 각 단계는 metrics.timer로 계측합니다 (APP_METRICS=1일 때만 기록, 꺼져 있으면 비용 없음).
+
+# 동시에 돌릴 OCR 작업 수 (환경변수로 조절, CPU 코어 수를 넘지 않음)
+DEFAULT_OCR_WORKERS = 4
+
+# OCR 설정 (캐시 키에 포함되므로 전처리/OCR 옵션을 바꾸면 이 값도 함께 바뀌어야 합니다)
+OCR_TARGET_WIDTH = 1500
+# 성적표(과목명/학점) 영역만 잘라서 OCR (검출 실패 시 전체 화면)
+OCR_USE_ROI = os.environ.get("OCR_USE_ROI", "1") != "0"
+# 전처리 방식: "pil"(기존 PIL 체인) / "numpy"(단일 버퍼 + 합성 LUT), 이진화: ""/"otsu"/"sauvola" (numpy 모드 전용)
+OCR_PREPROCESS = os.environ.get("OCR_PREPROCESS", "pil")
+OCR_BINARIZE = os.environ.get("OCR_BINARIZE", "")
+OCR_SHARPNESS = 2.0
+OCR_CONTRAST = 2.5
+# 약한 줄 재인식: 신뢰도가 낮거나 (강의명 학점) 형식/학점 규칙에 맞지 않는 줄만 잘라서 확대 후 다시 OCR
+OCR_REFINE = os.environ.get("OCR_REFINE", "0") != "0"
+OCR_REFINE_CONF = 60.0     # 이 신뢰도 미만이면 재인식 대상
+OCR_REFINE_SCALE = 2       # 잘라낸 줄 확대 배율
+OCR_REFINE_CREDIT_CONF = 70.0  # 학점 칸만 숫자로 다시 읽은 결과는 이 신뢰도 이상일 때만 사용
+CREDIT_WHITELIST = "0123456789."
+OCR_SIGNATURE = (f"{OCR_PREPROCESS}-v1|bin={OCR_BINARIZE}|w={OCR_TARGET_WIDTH}|sharp={OCR_SHARPNESS}|contrast={OCR_CONTRAST}"
+                 f"|{OCR_LANG}|{OCR_CONFIG}|data-v1|roi={int(OCR_USE_ROI)}|engine={get_backend().name}"
+                 f"|refine={int(OCR_REFINE)}/{OCR_REFINE_CONF}/{OCR_REFINE_SCALE}/{OCR_REFINE_CREDIT_CONF}")
+
+# 패턴: (강의명) (학점) 순서
+LINE_PATTERN = re.compile(r'^(.*?)\s+(\d+(?:\.\d+)?)(?:\s+.*)?$')
+
+ParsedRow = namedtuple("ParsedRow", ["name", "credit", "conf"])
+
+# (3) 단계 결과는 가볍기 때문에 메모리에만 보관
+_parsed_cache = OCRCache(max_entries=512)
+
+
+def read_image_bytes(image_file):
+    if hasattr(image_file, 'getvalue'): return image_file.getvalue()
+    if isinstance(image_file, (bytes, bytearray)): return bytes(image_file)
+    with open(image_file, 'rb') as f: return f.read()
+
+
+# --- (1) 전처리 ---
+def preprocess_image(image_bytes, mode=None):
+    """이미지 바이트 → OCR용 흑백 이미지 (mode: "pil" / "numpy", 기본값은 OCR_PREPROCESS)"""
+    mode = mode or OCR_PREPROCESS
+    if mode == "numpy":
+        return preprocess_image_numpy(image_bytes)
+    return preprocess_image_pil(image_bytes)
+
+def preprocess_image_pil(image_bytes):
+    """기존 방식: 1500px 축소 + 선명도/자동대비/대비 보정을 PIL 단계별로 수행"""
+    with metrics.timer("decode"):
+        # 이미지 로드 및 이진화
+        img = Image.open(io.BytesIO(image_bytes)).convert('L')
+
+        # 이미지 리사이징: 1500px
+        if img.width > OCR_TARGET_WIDTH:
+            ratio = OCR_TARGET_WIDTH / float(img.width)
+            new_height = int(float(img.height) * ratio)
+            img = img.resize((OCR_TARGET_WIDTH, new_height), Image.Resampling.LANCZOS)
+
+    # 이미지 전처리
+    with metrics.timer("enhance"):
+        img = ImageEnhance.Sharpness(img).enhance(OCR_SHARPNESS) #선명도 상향
+        img = ImageOps.autocontrast(img)
+        img = ImageEnhance.Contrast(img).enhance(OCR_CONTRAST) #대비 상향
+    return img
+
+def load_resized_gray(image_bytes):
+    """흑백 로드 + 목표 폭으로 축소 (JPEG는 축소 디코딩, 축소 폭이 작으면 가벼운 필터 사용)"""
+    img = Image.open(io.BytesIO(image_bytes))
+    if img.format == 'JPEG' and img.width > OCR_TARGET_WIDTH:
+        # JPEG는 디코딩 단계에서 1/2, 1/4 ... 로 바로 줄여 읽을 수 있음 (목표 크기 이상 유지)
+        img.draft('L', (OCR_TARGET_WIDTH, int(img.height * OCR_TARGET_WIDTH / img.width)))
+    img = img.convert('L')
+
+    if img.width > OCR_TARGET_WIDTH:
+        ratio = OCR_TARGET_WIDTH / float(img.width)
+        size = (OCR_TARGET_WIDTH, int(img.height * ratio))
+        # 축소 비율이 작으면(원본이 목표 폭에 가까우면) BILINEAR로도 충분, 크게 줄일 때만 LANCZOS
+        resample = Image.Resampling.BILINEAR if ratio > 0.75 else Image.Resampling.LANCZOS
+        img = img.resize(size, resample, reducing_gap=2.0)
+    return img
+
+# 선명화/LUT는 이 줄 수 단위로 나눠 처리해서 임시 배열이 이미지 전체 크기로 커지지 않게 함
+PREPROCESS_CHUNK_ROWS = 256
+
+def _sharpen_inplace(gray, factor):
+    """PIL ImageEnhance.Sharpness와 같은 3x3 SMOOTH 커널 기반 선명화 (uint8 버퍼를 직접 수정, 가장자리 1px 유지)"""
+    # smooth = (3x3 합 + 가운데*4) / 13, 결과 = factor*원본 + (1-factor)*smooth
+    # 3x3 합은 가로/세로로 나눠 더하면(분리 가능 커널) 덧셈 4번으로 끝남
+    h = gray.shape[0]
+    center_weight = factor + 4.0 * (1.0 - factor) / 13.0
+    box_weight = (1.0 - factor) / 13.0
+    prev_row = gray[0].copy()  # 위쪽 청크를 덮어쓰기 전의 경계 행
+    for top in range(1, h - 1, PREPROCESS_CHUNK_ROWS):
+        bottom = min(top + PREPROCESS_CHUNK_ROWS, h - 1)
+        block = np.empty((bottom - top + 2, gray.shape[1]), dtype=np.float32)
+        block[0] = prev_row
+        block[1:] = gray[top:bottom + 1]
+        prev_row = gray[bottom - 1].copy()
+
+        rows = block[:, :-2] + block[:, 1:-1]
+        rows += block[:, 2:]
+        box = rows[:-2] + rows[1:-1]
+        box += rows[2:]
+        center = block[1:-1, 1:-1]
+        center *= center_weight
+        box *= box_weight
+        center += box
+        np.clip(center, 0, 255, out=center)
+        np.rint(center, out=center)
+        gray[top:bottom, 1:-1] = center
+
+def _histogram(gray):
+    """256칸 히스토그램 (bincount가 uint8을 intp로 늘려 복사하므로 청크 단위로 누적)"""
+    hist = np.zeros(256, dtype=np.int64)
+    for top in range(0, gray.shape[0], PREPROCESS_CHUNK_ROWS):
+        hist += np.bincount(gray[top:top + PREPROCESS_CHUNK_ROWS].ravel(), minlength=256)
+    return hist
+
+def _contrast_lut(hist, contrast):
+    """자동대비(min~max → 0~255)와 평균 기준 대비 보정을 하나의 256칸 LUT로 합성"""
+    nonzero = np.flatnonzero(hist)
+    lo, hi = (nonzero[0], nonzero[-1]) if len(nonzero) else (0, 255)
+    levels = np.arange(256, dtype=np.float32)
+    if hi > lo:
+        auto = np.clip((levels - lo) * (255.0 / (hi - lo)), 0, 255).astype(np.uint8).astype(np.float32)
+    else:
+        auto = levels
+    # ImageEnhance.Contrast는 (자동대비 후) 이미지 평균 밝기를 기준으로 대비를 늘림 → 히스토그램으로 계산
+    mean = int((hist * auto).sum() / max(hist.sum(), 1) + 0.5)
+    return np.clip(mean + (auto - mean) * contrast, 0, 255).astype(np.uint8)
+
+def otsu_threshold(hist):
+    """히스토그램에서 Otsu 임계값 계산 (벡터화)"""
+    hist = hist.astype(np.float64)
+    total = hist.sum()
+    if total == 0: return 128
+    levels = np.arange(256)
+    w0 = np.cumsum(hist)
+    w1 = total - w0
+    mu0 = np.cumsum(hist * levels)
+    mu_total = mu0[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mu_total * w0 / total - mu0) ** 2 / (w0 * w1)
+    between[~np.isfinite(between)] = 0
+    return int(np.argmax(between))
+
+def sauvola_binarize(arr, window=25, k=0.2, r=128.0):
+    """Sauvola 지역 이진화 (그림자/배경 얼룩이 있는 캡쳐용)
+
+    전체 프레임 적분 영상 대신 PREPROCESS_CHUNK_ROWS 줄씩 (위아래 window/2 줄 포함) 띠 단위로 상자 합을 구합니다.
+    합은 정수(int64)로 정확히, 평균/표준편차는 float32로 계산하고, 띠마다 같은 버퍼를 다시 씁니다.
+    """
+    h, w = arr.shape
+    half = window // 2
+    out = np.empty((h, w), dtype=np.uint8)
+    x0 = np.clip(np.arange(w) - half, 0, w); x1 = np.clip(np.arange(w) + half + 1, 0, w)
+    width = (x1 - x0).astype(np.float32)
+
+    rows = min(h, PREPROCESS_CHUNK_ROWS + 2 * half)
+    slab = np.empty((rows, w), dtype=np.int64)
+    cols = np.zeros((rows, w + 1), dtype=np.int64)        # 가로 누적합
+    box = np.zeros((2, rows + 1, w), dtype=np.int64)       # 가로 상자 합의 세로 누적합 (합, 제곱합)
+    for top in range(0, h, PREPROCESS_CHUNK_ROWS):
+        bottom = min(h, top + PREPROCESS_CHUNK_ROWS)
+        lo, hi = max(0, top - half), min(h, bottom + half)
+        n = hi - lo
+        for plane, power in ((box[0], 1), (box[1], 2)):
+            np.copyto(slab[:n], arr[lo:hi])
+            if power == 2: slab[:n] *= slab[:n]
+            np.cumsum(slab[:n], axis=1, out=cols[:n, 1:])
+            np.subtract(cols[:n, x1], cols[:n, x0], out=slab[:n])
+            np.cumsum(slab[:n], axis=0, out=plane[1:n + 1])
+
+        y = np.arange(top, bottom)
+        y0 = np.clip(y - half, 0, h) - lo; y1 = np.clip(y + half + 1, 0, h) - lo
+        area = (y1 - y0).astype(np.float32)[:, None] * width
+        mean = (box[0][y1] - box[0][y0]).astype(np.float32) / area
+        var = (box[1][y1] - box[1][y0]).astype(np.float32) / area - mean * mean
+        np.maximum(var, 0, out=var)
+        threshold = mean * (1 + k * (np.sqrt(var) / r - 1))
+        out[top:bottom] = np.where(arr[top:bottom] > threshold, 255, 0)
+    return out
+
+def preprocess_image_numpy(image_bytes, binarize=None):
+    """NumPy 방식: 하나의 버퍼에서 선명화 → 합성 LUT(자동대비+대비) 한 번 적용 → (선택) 이진화"""
+    binarize = OCR_BINARIZE if binarize is None else binarize
+    with metrics.timer("decode"):
+        img = load_resized_gray(image_bytes)
+        gray = np.array(img, dtype=np.uint8)  # 이후 모든 연산은 이 버퍼에서 in-place
+        del img
+    with metrics.timer("enhance"):
+        return _enhance_array(gray, binarize)
+
+def _enhance_array(gray, binarize):
+    if gray.shape[0] > 2 and gray.shape[1] > 2:
+        _sharpen_inplace(gray, OCR_SHARPNESS)
+
+    hist = _histogram(gray)
+    lut = _contrast_lut(hist, OCR_CONTRAST)
+    if binarize == "otsu":
+        # 대비 보정 후의 히스토그램은 LUT로 바로 계산 가능 → Otsu 이진화까지 같은 LUT에 합성
+        contrasted_hist = np.bincount(lut, weights=hist, minlength=256)
+        threshold = otsu_threshold(contrasted_hist)
+        lut = np.where(lut > threshold, 255, 0).astype(np.uint8)
+
+    for top in range(0, gray.shape[0], PREPROCESS_CHUNK_ROWS):
+        chunk = gray[top:top + PREPROCESS_CHUNK_ROWS]
+        chunk[...] = lut[chunk]
+
+    if binarize == "sauvola":
+        # 지역 평균/분산이 필요해 LUT로 합칠 수 없음 (줄 띠 단위로 상자 합을 구해 한 번 더 훑음)
+        gray = sauvola_binarize(gray)
+    return Image.fromarray(gray, mode='L')
+
+
+# --- (1-1) 성적표 영역(ROI) 검출 ---
+# 에브리타임 성적표는 표 전체 너비의 얇은 가로 구분선과 열 사이 세로선으로 이루어져 있으므로,
+# 배경과 다른 픽셀의 행/열 투영(projection profile)으로 표 영역과 과목명·학점 열을 찾습니다.
+ROI_LINE_COVERAGE = 0.6    # 가로선: 한 행에서 배경과 다른 픽셀 비율
+ROI_COLUMN_COVERAGE = 0.8  # 세로선: 표 영역 안에서 한 열의 배경과 다른 픽셀 비율
+ROI_MIN_ROWS = 2           # 표로 인정할 최소 행(구분선 사이 칸) 수
+
+def _runs(mask):
+    """True가 연속된 구간을 [(시작, 끝(미포함)), ...]으로 반환"""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2], edges[1::2]))
+
+def detect_table_rows(img):
+    """표의 행(가로 구분선 사이) 구간 리스트 [(top, bottom), ...]. 표가 없으면 빈 리스트"""
+    arr = np.asarray(img, dtype=np.int16)
+    h, w = arr.shape
+    background = int(np.median(arr))
+    ink = np.abs(arr - background) > 12
+
+    # 가로 구분선: 폭 대부분을 덮는 얇은 행 묶음 (상단 검은 헤더처럼 두꺼운 띠는 제외)
+    max_line_thickness = max(3, h // 300)
+    line_rows = ink.mean(axis=1) > ROI_LINE_COVERAGE
+    lines = [(a, b) for a, b in _runs(line_rows) if b - a <= max_line_thickness]
+    if len(lines) < ROI_MIN_ROWS + 1: return []
+
+    # 구분선 사이 칸 중 표의 한 행으로 볼 만한 높이이고 글자가 있는 칸만 사용
+    min_row, max_row = w * 0.03, w * 0.2
+    rows = []
+    for (_, top), (bottom, _) in zip(lines, lines[1:]):
+        if not (min_row <= bottom - top <= max_row): continue
+        if not ink[top:bottom].any(): continue
+        rows.append((top, bottom))
+
+    # 가장 긴 "연속된" 행 묶음만 표로 인정 (차트 카드 등 떨어진 칸 제거)
+    groups, current = [], []
+    for row in rows:
+        if current and row[0] - current[-1][1] > max_line_thickness * 2:
+            groups.append(current); current = []
+        current.append(row)
+    if current: groups.append(current)
+    best = max(groups, key=len, default=[])
+    return best if len(best) >= ROI_MIN_ROWS else []
+
+def detect_table_region(img):
+    """과목명+학점 열만 포함하는 (left, top, right, bottom) 박스. 검출 실패 시 None"""
+    rows = detect_table_rows(img)
+    if not rows: return None
+    top, bottom = rows[0][0], rows[-1][1]
+
+    # 세로 구분선: 과목명 | 학점 | 성적 | 전공 → 두 번째 세로선 왼쪽까지만 남김 (성적/체크박스 잡음 제거)
+    arr = np.asarray(img, dtype=np.int16)[top:bottom]
+    background = int(np.median(arr))
+    col_ink = (np.abs(arr - background) > 12).mean(axis=0) > ROI_COLUMN_COVERAGE
+    w = arr.shape[1]
+    separators = [(a + b) // 2 for a, b in _runs(col_ink) if b - a <= 6 and w * 0.1 < (a + b) // 2 < w * 0.95]
+    right = separators[1] if len(separators) >= 2 else w
+    return (0, int(top), int(right), int(bottom))
+
+def crop_table_region(img):
+    """ROI로 잘라낸 이미지와 성공 여부를 반환 (실패 시 원본 그대로)"""
+    box = detect_table_region(img)
+    if box is None: return img, False
+    return img.crop(box), True
+
+
+# --- (2) OCR ---
+def recognize_lines(img, backend=None):
+    """전처리된 이미지 → OCRLine(text, conf, box) 리스트 (OCR_BACKEND로 선택한 엔진 사용)"""
+    with metrics.timer("ocr"):
+        lines = (backend or get_backend()).recognize(img)
+    metrics.incr("ocr_lines", len(lines))
+    return lines
+
+
+# --- (2-1) 약한 줄 재인식 ---
+# 한 번 더 전체 이미지를 OCR하는 대신, 문제가 있는 줄의 박스만 잘라 확대하고 세로로 쌓아서 tesseract를 한 번만 더 부릅니다.
+# 그래도 학점이 규칙 밖인 줄은 줄 오른쪽 끝(학점 칸)만 숫자 화이트리스트로 한 번 더 읽습니다.
+# 숫자만 허용하면 머리글이나 "더 입력하기" 버튼도 낮은 신뢰도의 숫자로 읽히므로, 끝에 숫자 토큰이 있는 줄만 다시 읽고 신뢰도가 충분할 때만 씁니다.
+REFINE_PAD = 4   # 줄 박스 주변 여백(px)
+REFINE_GAP = 24  # 쌓을 때 줄 사이 흰 여백(px, 확대 후)
+CREDIT_TOKEN = re.compile(r'\s+\S*\d\S*$')  # 줄 끝의 학점 자리 토큰 (숫자 포함, 앞에 강의명이 있어야 함)
+
+def _valid_credit(credit):
+    return credit == 0 or (credit % 0.5 == 0 and 0.5 <= credit <= 5.0)
+
+def _parse_credit(line_text):
+    match = LINE_PATTERN.search(line_text.strip())
+    if not match: return None, None
+    try:
+        return match.group(1).strip(), float(match.group(2))
+    except ValueError:
+        return match.group(1).strip(), None
+
+def _has_valid_credit(line_text):
+    credit = _parse_credit(line_text)[1]
+    return credit is not None and _valid_credit(credit)
+
+def needs_refine(line):
+    """재인식 대상인지: 신뢰도 낮음 / (강의명 학점) 형식 아님 / 학점이 0.5 단위 범위 밖"""
+    text = line.text.strip()
+    if line.box is None or len(text) < 2: return False
+    name, credit = _parse_credit(text)
+    if name is None:
+        # 숫자만 있는 줄 등은 제외하고, 강의명으로 보이는 글자가 있을 때만
+        return sum(ch.isalpha() for ch in text) >= 2
+    if credit is None or not _valid_credit(credit): return True
+    return line.conf < OCR_REFINE_CONF
+
+def _stack_crops(img, boxes, scale):
+    """각 박스를 잘라 scale배 확대 후 세로로 쌓은 이미지와 각 조각의 (top, bottom) 구간"""
+    crops = []
+    for left, top, right, bottom in boxes:
+        box = (max(0, left - REFINE_PAD), max(0, top - REFINE_PAD), min(img.width, right + REFINE_PAD), min(img.height, bottom + REFINE_PAD))
+        crop = img.crop(box)
+        crops.append(crop.resize((crop.width * scale, crop.height * scale), Image.Resampling.LANCZOS))
+    width = max(c.width for c in crops) + REFINE_GAP * 2
+    height = sum(c.height for c in crops) + REFINE_GAP * (len(crops) + 1)
+    sheet = Image.new('L', (width, height), 255)
+    slots, y = [], REFINE_GAP
+    for crop in crops:
+        sheet.paste(crop, (REFINE_GAP, y))
+        slots.append((y, y + crop.height))
+        y += crop.height + REFINE_GAP
+    return sheet, slots
+
+def _recognize_stacked(img, boxes, backend, whitelist=None):
+    """박스별 재인식 결과 OCRLine 리스트 (인식된 것이 없으면 None)"""
+    sheet, slots = _stack_crops(img, boxes, OCR_REFINE_SCALE)
+    found = [[] for _ in slots]
+    for line in backend.recognize(sheet, psm=OCR_PSM, whitelist=whitelist):
+        if line.box is None: continue
+        center = (line.box[1] + line.box[3]) / 2
+        for i, (top, bottom) in enumerate(slots):
+            if top - REFINE_GAP / 2 <= center < bottom + REFINE_GAP / 2:
+                found[i].append(line); break
+    results = []
+    for parts in found:
+        if not parts:
+            results.append(None); continue
+        parts.sort(key=lambda l: l.box[0])
+        results.append(OCRLine(" ".join(p.text for p in parts), round(sum(p.conf for p in parts) / len(parts), 1)))
+    return results
+
+def _credit_box(box):
+    """줄 박스의 오른쪽 끝 학점 칸 (높이의 3배 폭)"""
+    left, top, right, bottom = box
+    return (max(left, right - 3 * (bottom - top)), top, right, bottom)
+
+def refine_lines(img, lines, backend=None):
+    """약한 줄만 다시 OCR해서 더 나은 결과로 교체한 줄 리스트 (박스는 원래 줄 기준으로 유지)"""
+    backend = backend or get_backend()
+    weak = [i for i, line in enumerate(lines) if needs_refine(line)]
+    if not weak: return lines
+    metrics.incr("refine_candidates", len(weak))
+    lines = list(lines)
+
+    with metrics.timer("refine"):
+        # 1차: 줄 전체를 확대해서 다시 인식
+        for i, new in zip(weak, _recognize_stacked(img, [lines[i].box for i in weak], backend)):
+            if new is None: continue
+            old_ok = _has_valid_credit(lines[i].text)
+            new_ok = _has_valid_credit(new.text)
+            if (new_ok and not old_ok) or (new_ok == old_ok and new.conf > lines[i].conf):
+                lines[i] = OCRLine(new.text, new.conf, lines[i].box)
+                metrics.incr("refine_improved")
+
+        # 2차: 끝에 숫자 토큰이 있는데도 학점이 규칙 밖인 줄은 학점 칸만 숫자로 다시 읽음
+        missing = [i for i in weak if CREDIT_TOKEN.search(lines[i].text.strip()) and not _has_valid_credit(lines[i].text)]
+        if missing:
+            credits = _recognize_stacked(img, [_credit_box(lines[i].box) for i in missing], backend, CREDIT_WHITELIST)
+            for i, new in zip(missing, credits):
+                if new is None or new.conf < OCR_REFINE_CREDIT_CONF: continue
+                try:
+                    credit = float(new.text.split()[-1])
+                except ValueError:
+                    continue
+                if not _valid_credit(credit): continue
+                # 잘못 읽힌 끝 토큰을 떼고 강의명만 남긴 뒤 다시 읽은 학점을 붙임 (신뢰도는 다시 읽은 결과 기준)
+                name = CREDIT_TOKEN.sub('', lines[i].text.strip())
+                lines[i] = OCRLine(f"{name} {credit:g}", new.conf, lines[i].box)
+                metrics.incr("refine_credit_fixed")
+    return lines
+
+
+# --- (3) 줄 파싱 ---
+def parse_lines(lines):
+    """OCRLine 리스트 → 학점 규칙을 통과한 ParsedRow 리스트"""
+    with metrics.timer("parse"):
+        parsed = _parse_lines(lines)
+    metrics.incr("lines_parsed", len(parsed))
+    metrics.incr("lines_filtered", len(lines) - len(parsed))
+    return parsed
+
+def _parse_lines(lines):
+    parsed = []
+    for line in lines:
+        match = LINE_PATTERN.search(line.text.strip())
+        if not match: continue
+
+        clean_name = clean_course_name(match.group(1).strip()) # 괄호류 제거 + 연속 공백 축소
+
+        # 노이즈 필터링 (학점 != 0.5*n and 학점 > 5 필터링)
+        try:
+            credit = float(match.group(2))
+        except ValueError:
+            continue
+        if credit != 0:
+            if credit % 0.5 != 0 or credit < 0.5 or credit > 5.0:
+                continue
+
+        if clean_name != "채플":
+            if len(clean_name) < 3 or clean_name.isdigit(): continue
+
+        parsed.append(ParsedRow(clean_name, credit, line.conf))
+    return parsed
+
+
+# --- (4) 분류 ---
+def classify_rows(rows, classify, correct=None):
+    """ParsedRow 리스트 → 에디터용 행(dict). classify(강의명) -> 이수구분, correct(강의명) -> 교정된 강의명(선택)"""
+    with metrics.timer("classify"):
+        classified = []
+        for row in rows:
+            name = correct(row.name) if correct else row.name
+            if name != row.name: metrics.incr("names_corrected")
+            classified.append({"강의명": name, "학점": row.credit, "이수구분": classify(name)})
+    metrics.incr("rows_classified", len(classified))
+    return classified
+
+
+# --- 단계 연결 (캐시 적용) ---
+def _signature(start_y):
+    # 겹친 캡쳐의 아래쪽만 OCR한 결과는 전체 이미지 결과와 따로 캐시
+    return f"{OCR_SIGNATURE}|top={start_y}" if start_y else OCR_SIGNATURE
+
+def extract_lines(image_bytes, cache=None, start_y=0):
+    """(1)+(2): 이미지 해시 기준 캐시, 적중 시 전처리/tesseract 모두 생략. start_y > 0이면 그 아래만 OCR"""
+    cache = cache or get_default_cache()
+    key = make_cache_key(image_bytes, _signature(start_y))
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.incr("ocr_cache_hits")
+        return [OCRLine(*item) for item in cached]
+    metrics.incr("ocr_cache_misses")
+
+    img = preprocess_image(image_bytes)
+    if 0 < start_y < img.height:
+        img = img.crop((0, start_y, img.width, img.height))
+    lines = None
+    if OCR_USE_ROI:
+        with metrics.timer("roi"):
+            table_img, found = crop_table_region(img)
+        if found:
+            lines = recognize_lines(table_img)
+            # 잘라낸 영역에서 (강의명 학점) 줄을 하나도 못 찾으면 전체 화면으로 다시 시도
+            if not any(LINE_PATTERN.search(line.text.strip()) for line in lines):
+                lines = None
+            else:
+                img = table_img
+    if lines is None:
+        lines = recognize_lines(img)
+    if OCR_REFINE:
+        lines = refine_lines(img, lines)
+    cache.put(key, [list(line) for line in lines])
+    return lines
+
+
+def extract_rows(image_bytes, cache=None, start_y=0):
+    """(1)~(3): 분류 전 (강의명, 학점) 행. 년도/버전/전공과 무관하므로 이미지 단위로 캐시"""
+    key = make_cache_key(image_bytes, _signature(start_y))
+    cached = _parsed_cache.get(key)
+    if cached is not None:
+        metrics.incr("parsed_cache_hits")
+        return [ParsedRow(*row) for row in cached]
+
+    rows = parse_lines(extract_lines(image_bytes, cache, start_y))
+    _parsed_cache.put(key, [list(row) for row in rows])
+    return rows
+
+
+def ocr_image_parsing(image_file, classify, cache=None, correct=None, start_y=0):
+    """이미지 전처리 및 OCR 파싱 (전체 단계). 실패 시 빈 리스트"""
+    try:
+        with metrics.timer("image_total"):
+            rows = extract_rows(read_image_bytes(image_file), cache, start_y)
+            return classify_rows(rows, classify, correct)
+    except Exception:
+        metrics.incr("image_errors")
+        return []
+
+
+class IncrementalDeduper:
+    """이미지별 결과가 도착할 때마다 바로 중복 제거 (강의명 기준, "채플"이 포함된 행은 모두 유지하고 앞쪽에 모음)"""
+
+    def __init__(self):
+        self.chapel = []
+        self.others = []
+        self._seen = set()
+
+    def add(self, rows):
+        """새 행들을 반영하고, 실제로 추가된 행 리스트를 반환"""
+        added = []
+        for row in rows:
+            if "채플" in row["강의명"]:
+                self.chapel.append(row)
+            elif row["강의명"] not in self._seen:
+                self._seen.add(row["강의명"])
+                self.others.append(row)
+            else:
+                continue
+            added.append(row)
+        return added
+
+    def rows(self):
+        return self.chapel + self.others
+
+
+def dedupe_courses(rows):
+    """강의명 기준 중복 제거 (IncrementalDeduper와 같은 규칙, 기존 DataFrame 병합과 같은 순서)"""
+    deduper = IncrementalDeduper()
+    deduper.add(rows)
+    return deduper.rows()
+
+
+def ocr_cache_stats():
+    """OCR 생략 여부 기준 캐시 통계 (줄 캐시 + 파싱 결과 캐시 합산)"""
+    lines_stats = get_default_cache().stats()
+    parsed_stats = _parsed_cache.stats()
+    return {
+        "hits": lines_stats["hits"] + lines_stats["disk_hits"] + parsed_stats["hits"],
+        "misses": lines_stats["misses"],
+        "entries": lines_stats["entries"],
+    }
+
+
+def resolve_worker_count(requested=None, n_items=None):
+    """요청한 워커 수를 CPU 코어 수와 이미지 수로 제한"""
+    if requested is None:
+        try:
+            requested = int(os.environ.get("OCR_WORKERS", DEFAULT_OCR_WORKERS))
+        except ValueError:
+            requested = DEFAULT_OCR_WORKERS
+    workers = max(1, min(requested, os.cpu_count() or 1))
+    if n_items is not None:
+        workers = max(1, min(workers, n_items))
+    return workers
+
+
+def iter_completed(func, items, max_workers=None, initializer=None):
+    """items 각각에 func를 스레드 풀에서 적용하고, 끝나는 순서대로 (입력 인덱스, 결과)를 내보냄"""
+    items = list(items)
+    workers = resolve_worker_count(max_workers, len(items))
+
+    if workers == 1:
+        for i, item in enumerate(items):
+            yield i, func(item)
+        return
+
+    # tesseract 내부 OpenMP 스레드까지 겹치면 코어가 과점유되므로 프로세스당 1스레드로 제한
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    with ThreadPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        futures = {pool.submit(func, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def iter_ocr_results(image_files, classify, max_workers=None, cache=None, correct=None, start_ys=None, submit=None):
+    """이미지별 OCR+분류 결과를 끝나는 대로 (업로드 인덱스, 행 리스트)로 스트리밍
+
+    start_ys[i]: i번째 이미지에서 OCR을 시작할 y 좌표 (0이면 전체, None이면 OCR 생략하고 빈 결과)
+    submit: 서버 전역 스케줄러에 제출하는 함수 submit(func, jobs) → (인덱스, 결과) 이터레이터.
+            주면 자체 스레드 풀 대신 스케줄러의 워커에서 OCR합니다 (max_workers 무시).
+    """
+    start_ys = start_ys or [0] * len(image_files)
+    jobs = [(i, f, y) for i, (f, y) in enumerate(zip(image_files, start_ys)) if y is not None]
+    for i, y in enumerate(start_ys):
+        if y is None: yield i, []
+    func = lambda job: ocr_image_parsing(job[1], classify, cache, correct, job[2])
+    stream = submit(func, jobs) if submit else iter_completed(func, jobs, max_workers)
+    for j, rows in stream:
+        yield jobs[j][0], rows
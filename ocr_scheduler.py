@@ -0,0 +1,272 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from metrics import metrics
+
+# --- 서버 전역 OCR 작업 스케줄러 ---
+# Streamlit은 세션마다 스크립트 스레드가 따로 돌기 때문에, 각 세션이 직접 tesseract를 띄우면
+# 동시에 "분석 실행"을 누른 학생 수만큼 tesseract 프로세스가 생겨 코어가 과점유됩니다.
+# 이 모듈은 프로세스에 하나뿐인 작업 큐와 코어 수만큼의 고정 워커로 모든 세션의 OCR을 처리합니다.
+# - 공정성: 세션별 대기열을 따로 두고 워커는 세션을 돌아가며(라운드 로빈) 한 장씩 꺼냅니다.
+#           이미지 20장을 올린 세션이 있어도 1장을 올린 세션은 앞 세션의 20장을 기다리지 않습니다.
+# - 대기 순번: 티켓마다 "내 다음 이미지 앞에 몇 장이 있는지"를 계산해 화면에 보여줄 수 있습니다.
+# - 과부하 거절: 전체 대기 이미지 수나 세션별 대기 수가 한도를 넘으면 큐에 넣지 않고 SchedulerBusy를 냅니다.
+#   세션당 한도보다 많은 이미지를 한 번에 올린 경우는 과부하가 아니므로 iter_results가 한도만큼씩 나눠 차례로 제출합니다.
+#
+# 환경변수
+#   OCR_SCHEDULER_WORKERS=코어 수     동시에 실행할 OCR 작업 수
+#   OCR_SCHEDULER_MAX_QUEUE=200      전체 대기 이미지 한도
+#   OCR_SCHEDULER_MAX_PER_SESSION=30 세션 하나가 한 번에 넣을 수 있는 이미지 한도
+
+DEFAULT_MAX_QUEUE = 200
+DEFAULT_MAX_PER_SESSION = 30
+DURATION_EWMA = 0.2  # 작업 시간 이동평균 가중치 (예상 대기시간 계산용)
+
+
+class SchedulerBusy(Exception):
+    """대기열이 가득 차서 작업을 받지 않음 (retry_after: 예상 대기 초)"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Job:
+    __slots__ = ("ticket", "index", "item", "enqueued")
+
+    def __init__(self, ticket, index, item):
+        self.ticket = ticket
+        self.index = index
+        self.item = item
+        self.enqueued = time.monotonic()
+
+
+class Ticket:
+    """한 번의 submit(이미지 묶음)에 대한 진행 상황과 결과"""
+
+    def __init__(self, scheduler, session_id, func, total):
+        self.scheduler = scheduler
+        self.session_id = session_id
+        self.func = func
+        self.total = total
+        self.done = 0
+        self.cancelled = False
+        self._results = deque()  # (인덱스, 결과, 예외)
+        self._cond = threading.Condition(scheduler._lock)
+
+    def position(self):
+        """다음으로 처리될 이 티켓의 이미지 앞에 대기 중인 이미지 수 (0이면 곧 시작 또는 처리 중)"""
+        return self.scheduler._position(self)
+
+    def estimated_wait(self):
+        """예상 대기 시간(초)"""
+        return self.scheduler._estimate(self.position())
+
+    def cancel(self):
+        """아직 시작하지 않은 작업을 대기열에서 뺌 (실행 중인 작업은 끝까지 돌고 결과는 버려짐)"""
+        self.scheduler._cancel(self)
+
+    def results(self, on_wait=None, poll=0.5):
+        """끝나는 순서대로 (입력 인덱스, 결과)를 내보냄. 기다리는 동안 poll초마다 on_wait(티켓)를 호출
+
+        반복을 중간에 멈추면(스크립트 재실행 등) 남은 작업은 취소됩니다.
+        """
+        try:
+            received = 0
+            while received < self.total:
+                with self._cond:
+                    if not self._results:
+                        self._cond.wait(poll)
+                    item = self._results.popleft() if self._results else None
+                if item is None:
+                    if self.cancelled: return  # 같은 세션이 새로 제출해서 대체됨
+                    if on_wait: on_wait(self)
+                    continue
+                received += 1
+                index, result, error = item
+                if error is not None: raise error
+                yield index, result
+        finally:
+            if self.done < self.total: self.cancel()
+
+
+class OCRScheduler:
+    """세션별 라운드 로빈 대기열 + 고정 워커 풀 (스레드 안전)"""
+
+    def __init__(self, workers=None, max_queue=DEFAULT_MAX_QUEUE, max_per_session=DEFAULT_MAX_PER_SESSION):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.max_per_session = max_per_session
+        self._lock = threading.Lock()
+        self._has_work = threading.Condition(self._lock)
+        self._queues = OrderedDict()  # session_id → deque[_Job], 맨 앞 세션이 다음 차례
+        self._pending = 0
+        self._running = 0
+        self._avg_duration = None
+        self._threads = []
+        self.rejected = 0
+
+    def _start(self):
+        if self._threads: return
+        # tesseract 내부 OpenMP 스레드까지 겹치면 워커 수를 코어 수로 맞춘 의미가 없어지므로 1스레드로 제한
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"ocr-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, session_id, func, items, replace=True):
+        """items 각각에 func를 적용하는 작업을 대기열에 넣고 Ticket 반환. 한도를 넘으면 SchedulerBusy
+
+        replace=True면 같은 세션이 이전에 넣고 아직 시작하지 않은 작업은 취소합니다 (다시 실행 버튼을 누른 경우).
+        """
+        items = list(items)
+        with self._lock:
+            if replace:
+                for job in self._queues.pop(session_id, ()):
+                    job.ticket.cancelled = True
+                    job.ticket.done += 1
+                    self._pending -= 1
+            queued = len(self._queues.get(session_id, ()))
+            if queued + len(items) > self.max_per_session or self._pending + len(items) > self.max_queue:
+                self.rejected += 1
+                metrics.incr("scheduler_rejected")
+                retry_after = self._estimate(self._pending)
+                limit = "세션당" if queued + len(items) > self.max_per_session else "전체"
+                raise SchedulerBusy(f"OCR 대기열이 가득 찼습니다 ({limit} 한도).", retry_after)
+
+            ticket = Ticket(self, session_id, func, len(items))
+            if not items: return ticket
+            queue = self._queues.get(session_id)
+            if queue is None:
+                queue = self._queues[session_id] = deque()
+            queue.extend(_Job(ticket, i, item) for i, item in enumerate(items))
+            self._pending += len(items)
+            self._publish()
+            self._start()
+            self._has_work.notify(len(items))
+        metrics.incr("scheduler_jobs", len(items))
+        return ticket
+
+    def iter_results(self, session_id, func, items, on_wait=None, poll=0.5):
+        """submit + Ticket.results. 세션당 한도보다 많으면 한도만큼씩 나눠 앞 묶음이 끝난 뒤 다음 묶음을 제출
+
+        (입력 인덱스, 결과)를 끝나는 순서대로 내보냄. 전체 대기열이 가득 차면 도중에라도 SchedulerBusy
+        """
+        items = list(items)
+        size = max(1, self.max_per_session)
+        for start in range(0, len(items), size):
+            ticket = self.submit(session_id, func, items[start:start + size])
+            for index, result in ticket.results(on_wait=on_wait, poll=poll):
+                yield start + index, result
+
+    def _next_job(self):
+        """라운드 로빈: 맨 앞 세션에서 한 장 꺼내고, 그 세션은 (남은 작업이 있으면) 맨 뒤로"""
+        session_id, queue = next(iter(self._queues.items()))
+        job = queue.popleft()
+        del self._queues[session_id]
+        if queue: self._queues[session_id] = queue
+        self._pending -= 1
+        return job
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                while not self._queues:
+                    self._has_work.wait()
+                job = self._next_job()
+                self._running += 1
+                self._publish()
+            metrics.observe("queue_wait", time.monotonic() - job.enqueued)
+
+            start = time.monotonic()
+            result, error = None, None
+            try:
+                result = job.ticket.func(job.item)
+            except Exception as e:
+                error = e
+            duration = time.monotonic() - start
+
+            with self._lock:
+                self._running -= 1
+                self._avg_duration = duration if self._avg_duration is None else \
+                    self._avg_duration + DURATION_EWMA * (duration - self._avg_duration)
+                ticket = job.ticket
+                ticket.done += 1
+                if not ticket.cancelled:
+                    ticket._results.append((job.index, result, error))
+                    ticket._cond.notify_all()
+                self._publish()
+
+    def _cancel(self, ticket):
+        with self._lock:
+            ticket.cancelled = True
+            queue = self._queues.get(ticket.session_id)
+            if not queue: return
+            kept = deque(job for job in queue if job.ticket is not ticket)
+            removed = len(queue) - len(kept)
+            ticket.done += removed
+            self._pending -= removed
+            if kept:
+                self._queues[ticket.session_id] = kept
+            else:
+                del self._queues[ticket.session_id]
+            metrics.incr("scheduler_cancelled", removed)
+            self._publish()
+
+    def _position(self, ticket):
+        """라운드 로빈 순서로 이 티켓의 다음 작업 앞에 있는 작업 수"""
+        with self._lock:
+            order = list(self._queues.items())
+            for rank, (session_id, queue) in enumerate(order):
+                if session_id != ticket.session_id: continue
+                own = next((n for n, job in enumerate(queue) if job.ticket is ticket), None)
+                if own is None: return 0
+                # 한 바퀴에 세션마다 한 장씩: own바퀴 동안 다른 세션들이 꺼낼 수 있는 만큼 + 이번 바퀴에서 앞 차례인 세션들
+                ahead = own
+                for other_rank, (other_id, other) in enumerate(order):
+                    if other_id == session_id: continue
+                    ahead += min(len(other), own + (1 if other_rank < rank else 0))
+                return ahead
+            return 0
+
+    def _estimate(self, jobs_ahead):
+        avg = self._avg_duration or 1.0
+        return round((jobs_ahead / self.workers + 1) * avg, 1)
+
+    def _publish(self):
+        metrics.set_gauge("scheduler_queue_depth", self._pending)
+        metrics.set_gauge("scheduler_running", self._running)
+        metrics.set_gauge("scheduler_sessions_waiting", len(self._queues))
+
+    def stats(self):
+        """{"workers", "pending", "running", "sessions", "rejected", "avg_job_s"}"""
+        with self._lock:
+            return {"workers": self.workers, "pending": self._pending, "running": self._running,
+                    "sessions": len(self._queues), "rejected": self.rejected,
+                    "avg_job_s": round(self._avg_duration or 0.0, 3)}
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """프로세스 전역 스케줄러 (처음 작업이 들어올 때 워커 스레드 시작)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = OCRScheduler(
+                workers=_env_int("OCR_SCHEDULER_WORKERS", os.cpu_count() or 1),
+                max_queue=_env_int("OCR_SCHEDULER_MAX_QUEUE", DEFAULT_MAX_QUEUE),
+                max_per_session=_env_int("OCR_SCHEDULER_MAX_PER_SESSION", DEFAULT_MAX_PER_SESSION),
+            )
+        return _scheduler
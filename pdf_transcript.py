@@ -0,0 +1,187 @@
+import io
+import re
+from collections import namedtuple
+
+import pdfplumber
+
+from course_index import FALLBACK_MATCH, clean_course_name
+from metrics import metrics
+
+# --- 포털 성적증명서 PDF: 텍스트 레이어에서 바로 읽기 ---
+# 연세포탈에서 내려받은 성적증명서/성적표 PDF는 글자가 텍스트로 들어 있으므로 OCR 없이 (강의명, 학점, 이수구분) 행을 얻을 수 있습니다.
+# - 쪽 단위로 처리하고 다 읽은 쪽은 바로 닫습니다 (8학기 성적표도 메모리에 한 쪽씩만).
+# - 표 선이 있으면 머리글(교과목명/학점/이수구분/성적)로 열을 찾고, 머리글 없이 이어지는 다음 쪽 표는 앞 쪽 열 배치를 그대로 씁니다.
+#   좌우 두 단으로 된 성적표처럼 한 표에 같은 머리글이 두 번 나오면 묶음마다 따로 읽습니다.
+# - 표가 없으면 텍스트 줄에서 "[학정번호] 교과목명 학점 성적 [이수구분]" 형식을 찾습니다.
+# - 글자가 하나도 없는 쪽(스캔본)은 이미지로 렌더링해서 돌려주고, 호출한 쪽에서 기존 OCR 경로로 처리합니다.
+# - F/NP 등 취득하지 못한 과목은 제외합니다.
+# - 손상되었거나 암호가 걸린 PDF는 PdfReadError를 냅니다 (앱은 그 파일만 건너뛰고, CLI는 그 학생을 오류로 기록).
+
+PDF_RENDER_RESOLUTION = 200  # 스캔 쪽을 OCR용 이미지로 렌더링할 해상도(dpi)
+
+NAME_HEADERS = ("교과목명", "과목명", "강의명", "교과목", "coursetitle", "title", "course")
+CREDIT_HEADERS = ("학점", "credit", "credits")
+TYPE_HEADERS = ("이수구분", "구분", "classification", "category")
+GRADE_HEADERS = ("성적", "등급", "grade")
+
+# 성적표의 이수구분 약어 → 에디터 이수구분 (교양 영역은 강의명으로 분류하는 편이 더 정확하므로 전공만 사용)
+HINT_TYPES = {"전필": "전공필수", "전공필수": "전공필수", "전선": "전공선택", "전공선택": "전공선택",
+              "전기": "전공선택", "전공기초": "전공선택"}
+FAILED_GRADES = {"F", "NP", "U", "W"}
+SUMMARY_NAMES = {"계", "합계", "소계", "학기계", "총계", "total", "subtotal"}
+
+GRADE_PATTERN = r'A\+|A0|A-|B\+|B0|B-|C\+|C0|C-|D\+|D0|D-|F|P|NP|S|U|W'
+HINT_PATTERN = r'전필|전선|전기|교필|교선|교기|대교|기교|일선|공기|전공필수|전공선택|전공기초'
+# 텍스트 줄의 한 과목 (두 단 성적표는 한 줄에 두 과목이 있으므로 finditer로 모두 찾음)
+RECORD_PATTERN = re.compile(
+    r'(?:\d{1,3}\s+)?(?:(?P<code>[A-Z]{3,4}\d{4})(?:-\d{2}(?:-\d{2})?)?\s+)?'
+    r'(?P<name>\S.*?)\s+(?P<credit>\d(?:\.\d)?)\s+'
+    rf'(?P<grade>{GRADE_PATTERN})(?=\s|$)'
+    rf'(?:\s+(?P<hint>{HINT_PATTERN})(?=\s|$))?'
+)
+
+# hint: 성적표에 적힌 이수구분 원문 (없으면 ""), grade: 성적 (없으면 "")
+TranscriptRow = namedtuple("TranscriptRow", ["name", "credit", "hint", "grade"])
+# rows: 텍스트에서 읽은 행, image: 스캔 쪽이면 OCR할 PNG 바이트 (아니면 None), source: "text" / "scan"
+PdfPage = namedtuple("PdfPage", ["index", "rows", "image", "source"])
+# 표 한 묶음의 열 위치 (없는 열은 None)
+ColumnGroup = namedtuple("ColumnGroup", ["name", "credit", "hint", "grade"])
+
+
+class PdfReadError(ValueError):
+    """열 수 없거나 읽는 중 깨진 PDF (손상/암호화)"""
+
+
+def _norm_header(cell):
+    return re.sub(r'\s+', '', cell or '').lower()
+
+
+def _find_columns(header):
+    """머리글 행 → ColumnGroup 리스트 (교과목명 열마다 한 묶음, 학점/구분/성적은 그 뒤 가장 가까운 열)"""
+    cells = [_norm_header(c) for c in header]
+    starts = [i for i, c in enumerate(cells) if c in NAME_HEADERS]
+    groups = []
+    for n, start in enumerate(starts):
+        end = starts[n + 1] if n + 1 < len(starts) else len(cells)
+        def find(names):
+            return next((i for i in range(start + 1, end) if cells[i] in names), None)
+        credit = find(CREDIT_HEADERS)
+        if credit is None: continue
+        groups.append(ColumnGroup(start, credit, find(TYPE_HEADERS), find(GRADE_HEADERS)))
+    return groups
+
+
+def _make_row(name, credit, hint="", grade=""):
+    """셀 값 → TranscriptRow (과목 행이 아니거나 취득하지 못한 과목이면 None)"""
+    name = clean_course_name(name or "")
+    if not name or re.sub(r'\s+', '', name).lower() in SUMMARY_NAMES: return None
+    try:
+        credit = float((credit or "").strip())
+    except ValueError:
+        return None
+    # OCR 줄 파싱과 같은 학점 규칙 (0.5 단위, 0.5~5, 채플은 0학점)
+    if credit != 0 and (credit % 0.5 != 0 or credit < 0.5 or credit > 5.0): return None
+    grade = (grade or "").strip().upper()
+    if grade in FAILED_GRADES: return None
+    return TranscriptRow(name, credit, (hint or "").strip(), grade)
+
+
+def _rows_from_tables(tables, columns):
+    """표 → (행 리스트, 마지막으로 쓴 열 배치). 머리글이 없는 표는 columns(앞 쪽 배치)로 읽음"""
+    rows = []
+    for table in tables:
+        for cells in table:
+            found = _find_columns(cells)
+            if found:
+                columns = found; continue
+            if not columns: continue
+            for group in columns:
+                if max(i for i in group if i is not None) >= len(cells): continue
+                cell = lambda i: cells[i] if i is not None else ""
+                row = _make_row(cell(group.name), cell(group.credit), cell(group.hint), cell(group.grade))
+                if row: rows.append(row)
+    return rows, columns
+
+
+def _rows_from_text(text):
+    rows = []
+    for line in text.splitlines():
+        for match in RECORD_PATTERN.finditer(line.strip()):
+            row = _make_row(match.group("name"), match.group("credit"), match.group("hint"), match.group("grade"))
+            if row: rows.append(row)
+    return rows
+
+
+def extract_page_rows(page, columns=None):
+    """텍스트가 있는 쪽 → (행 리스트, 다음 쪽에 넘길 열 배치)"""
+    rows, columns = _rows_from_tables(page.extract_tables(), columns)
+    if not rows:
+        rows = _rows_from_text(page.extract_text() or "")
+    return rows, columns
+
+
+def _render_page(page):
+    with page.to_image(resolution=PDF_RENDER_RESOLUTION).original as img:
+        buf = io.BytesIO()
+        img.convert("L").save(buf, format="PNG")
+        return buf.getvalue()
+
+
+def iter_pdf_pages(pdf_file):
+    """PDF(바이트/파일 객체/경로) → 쪽마다 PdfPage를 순서대로 생성. 읽을 수 없으면 PdfReadError"""
+    source = io.BytesIO(pdf_file) if isinstance(pdf_file, (bytes, bytearray)) else pdf_file
+    # pdfminer는 손상/암호화 종류마다 다른 예외(PdfminerException, PSEOF, PDFSyntaxError 등)를 내므로 모두 PdfReadError로 바꿈
+    try:
+        pdf = pdfplumber.open(source)
+    except Exception as e:
+        metrics.incr("pdf_errors")
+        raise PdfReadError(f"PDF를 열 수 없습니다 (손상되었거나 암호가 걸린 파일): {e}") from e
+    with pdf:
+        try:
+            pages = pdf.pages
+        except Exception as e:
+            metrics.incr("pdf_errors")
+            raise PdfReadError(f"PDF 쪽 목록을 읽을 수 없습니다: {e}") from e
+        columns = None
+        for index, page in enumerate(pages):
+            try:
+                with metrics.timer("pdf_page"):
+                    if page.chars:
+                        rows, columns = extract_page_rows(page, columns)
+                        metrics.incr("pdf_pages_text")
+                        metrics.incr("pdf_rows", len(rows))
+                        result = PdfPage(index, rows, None, "text")
+                    else:
+                        # 텍스트 레이어가 없는 스캔 쪽: OCR 경로로 넘김
+                        metrics.incr("pdf_pages_scanned")
+                        result = PdfPage(index, [], _render_page(page), "scan")
+            except Exception as e:
+                metrics.incr("pdf_errors")
+                raise PdfReadError(f"PDF {index + 1}쪽을 읽을 수 없습니다: {e}") from e
+            finally:
+                page.close()  # 다 읽은 쪽의 글자/도형 캐시 해제
+            yield result
+
+
+def classify_transcript_rows(rows, classify):
+    """TranscriptRow 리스트 → 에디터용 행(dict). 강의명으로 분류가 안 될 때만 성적표의 전공 이수구분 사용"""
+    with metrics.timer("classify"):
+        classified = []
+        for row in rows:
+            ftype = classify(row.name)
+            if ftype == FALLBACK_MATCH.ftype:
+                ftype = HINT_TYPES.get(row.hint, ftype)
+            classified.append({"강의명": row.name, "학점": row.credit, "이수구분": ftype})
+    metrics.incr("rows_classified", len(classified))
+    return classified
+
+
+def read_transcript(pdf_file, classify):
+    """PDF 전체 → (에디터용 행 리스트, OCR이 필요한 스캔 쪽 PNG 바이트 리스트). 읽을 수 없으면 PdfReadError"""
+    rows, scanned = [], []
+    for page in iter_pdf_pages(pdf_file):
+        if page.image is not None:
+            scanned.append(page.image)
+        else:
+            rows.extend(classify_transcript_rows(page.rows, classify))
+    return rows, scanned
@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+
+from course_index import CourseIndex, FuzzyCourseIndex, normalize_string
+
+# --- 졸업요건 런타임 모델 ---
+# requirements.json을 (년도, 버전, 전공)별 불변 객체로 한 번만 컴파일합니다.
+# 강의명/키워드 정규화와 매칭 인덱스 생성을 미리 끝내 두므로, 화면이 다시 그려질 때마다 반복하지 않습니다.
+# 파일 수정 시각(mtime)이 바뀌면 자동으로 다시 컴파일합니다.
+
+AREA_KEY = "area_courses"
+CREDIT_FIELDS = ["total_credits", "major_total", "major_required", "major_elective", "advanced_course"]
+KNOWN_LIST_FIELDS = ["major_required", "major_elective", "advanced_keywords"]
+
+
+class RequirementsError(ValueError):
+    """requirements.json 형식 오류 (errors에 항목별 메시지 목록)"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("requirements.json 형식 오류:\n" + "\n".join(f"- {e}" for e in self.errors))
+
+
+class _Frozen:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__}은(는) 변경할 수 없습니다")
+
+    def _init(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+
+class RequiredCourse(_Frozen):
+    """필수교양 항목 (keywords는 정규화된 튜플)"""
+    __slots__ = ("name", "count", "keywords", "raw_keywords")
+
+    def __init__(self, name, count, keywords):
+        self._init(name=name, count=count, raw_keywords=tuple(keywords),
+                   keywords=tuple(k for k in (normalize_string(kw) for kw in keywords) if k))
+
+    def is_satisfied_by(self, norm_names):
+        return any(kw in name for name in norm_names for kw in self.keywords)
+
+
+class RequirementSet(_Frozen):
+    """(년도, 버전, 전공) 하나의 졸업요건 + 미리 만들어 둔 매칭 도구"""
+    __slots__ = (
+        "year", "version", "dept",
+        "total_credits", "major_total", "major_required_credits", "major_elective_credits", "advanced_course",
+        "required_courses", "required_areas", "major_required", "major_required_core", "major_elective",
+        "advanced_keywords", "index", "fuzzy",
+    )
+
+    def __init__(self, year, version, dept, entry, area_courses=None):
+        known = entry.get("known_courses", {})
+        gen = entry.get("general_education", {})
+        major_required = tuple(known.get("major_required", []))
+        self._init(
+            year=year, version=version, dept=dept,
+            total_credits=entry["total_credits"],
+            major_total=entry["major_total"],
+            major_required_credits=entry["major_required"],
+            major_elective_credits=entry["major_elective"],
+            advanced_course=entry["advanced_course"],
+            required_courses=tuple(RequiredCourse(item["name"], item.get("count", 1), item["keywords"])
+                                   for item in gen.get("required_courses", [])),
+            required_areas=tuple(gen.get("required_areas", [])),
+            major_required=major_required,
+            # 전공필수 이수 판정은 정규화된 강의명 앞 4글자("면역혈액" 등) 기준
+            major_required_core=tuple((name, normalize_string(name)[:4]) for name in major_required),
+            major_elective=tuple(known.get("major_elective", [])),
+            # 심화 키워드: 정규화 + 중복 제거 + 길이순 (짧은 키워드가 먼저 걸리도록)
+            advanced_keywords=tuple(sorted(set(normalize_string(kw) for kw in known.get("advanced_keywords", [])), key=len)),
+            index=CourseIndex.from_db({AREA_KEY: area_courses or {}, year: {version: {dept: entry}}}, year, version, dept),
+            # OCR 오타 교정용: 교양 영역 강의 + 이 전공의 전공필수/전공선택 + 필수교양 키워드
+            fuzzy=FuzzyCourseIndex.from_requirements(
+                area_courses or {}, major_required, known.get("major_elective", []),
+                [kw for item in gen.get("required_courses", []) for kw in item["keywords"]]),
+        )
+
+    def __repr__(self):
+        return f"RequirementSet({self.year!r}, {self.version!r}, {self.dept!r})"
+
+
+class RequirementsCatalog(_Frozen):
+    """컴파일된 전체 requirements.json"""
+    __slots__ = ("area_courses", "entries", "mtime")
+
+    def __init__(self, data, mtime=None):
+        area_courses = {area: tuple(courses) for area, courses in data.get(AREA_KEY, {}).items()}
+        entries = {}
+        for year, versions in data.items():
+            if year == AREA_KEY: continue
+            for version, depts in versions.items():
+                for dept, entry in depts.items():
+                    entries[(year, version, dept)] = RequirementSet(year, version, dept, entry, area_courses)
+        self._init(area_courses=area_courses, entries=entries, mtime=mtime)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def years(self):
+        return sorted({year for year, _, _ in self.entries})
+
+    def versions(self, year):
+        return list(dict.fromkeys(v for y, v, _ in self.entries if y == year))
+
+    def depts(self, year, version):
+        return [d for y, v, d in self.entries if y == year and v == version]
+
+    def get(self, year, version, dept):
+        return self.entries.get((year, version, dept))
+
+    def index_for(self, year, version, dept):
+        """해당 전공의 매칭 인덱스. 요건이 없으면 교양 영역/RC만 매칭하는 인덱스"""
+        req = self.get(year, version, dept)
+        if req is not None: return req.index
+        return CourseIndex.from_db({AREA_KEY: self.area_courses}, year, version, dept)
+
+    def fuzzy_for(self, year, version, dept):
+        """해당 전공의 강의명 근사 매칭 인덱스. 요건이 없으면 교양 영역 강의만"""
+        req = self.get(year, version, dept)
+        if req is not None: return req.fuzzy
+        return FuzzyCourseIndex.from_requirements(self.area_courses)
+
+
+# --- 스키마 검증 ---
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+def _is_str_list(v):
+    return isinstance(v, list) and all(isinstance(x, str) for x in v)
+
+def validate_requirements(data):
+    """형식 오류 메시지 리스트 반환 (오류가 없으면 빈 리스트)"""
+    errors = []
+    if not isinstance(data, dict):
+        return ["최상위 값은 객체여야 합니다"]
+
+    areas = data.get(AREA_KEY, {})
+    if not isinstance(areas, dict):
+        errors.append(f"{AREA_KEY}: 객체여야 합니다")
+    else:
+        for area, courses in areas.items():
+            if not _is_str_list(courses):
+                errors.append(f"{AREA_KEY}.{area}: 문자열 리스트여야 합니다")
+
+    for year, versions in data.items():
+        if year == AREA_KEY: continue
+        if not isinstance(versions, dict):
+            errors.append(f"{year}: 객체여야 합니다"); continue
+        for version, depts in versions.items():
+            if not isinstance(depts, dict):
+                errors.append(f"{year}.{version}: 객체여야 합니다"); continue
+            for dept, entry in depts.items():
+                where = f"{year}.{version}.{dept}"
+                if not isinstance(entry, dict):
+                    errors.append(f"{where}: 객체여야 합니다"); continue
+                for field in CREDIT_FIELDS:
+                    if not _is_number(entry.get(field)):
+                        errors.append(f"{where}.{field}: 숫자가 필요합니다")
+                known = entry.get("known_courses", {})
+                if not isinstance(known, dict):
+                    errors.append(f"{where}.known_courses: 객체여야 합니다")
+                else:
+                    for field in KNOWN_LIST_FIELDS:
+                        if field in known and not _is_str_list(known[field]):
+                            errors.append(f"{where}.known_courses.{field}: 문자열 리스트여야 합니다")
+                gen = entry.get("general_education", {})
+                if not isinstance(gen, dict):
+                    errors.append(f"{where}.general_education: 객체여야 합니다"); continue
+                for i, item in enumerate(gen.get("required_courses", [])):
+                    if not isinstance(item, dict) or not isinstance(item.get("name"), str) or not _is_str_list(item.get("keywords")):
+                        errors.append(f"{where}.general_education.required_courses[{i}]: name(문자열)과 keywords(문자열 리스트)가 필요합니다")
+                    elif "count" in item and not _is_number(item["count"]):
+                        errors.append(f"{where}.general_education.required_courses[{i}].count: 숫자가 필요합니다")
+                if "required_areas" in gen and not _is_str_list(gen["required_areas"]):
+                    errors.append(f"{where}.general_education.required_areas: 문자열 리스트여야 합니다")
+    return errors
+
+
+def compile_requirements(data, mtime=None):
+    """dict → RequirementsCatalog (형식 오류 시 RequirementsError)"""
+    errors = validate_requirements(data)
+    if errors:
+        raise RequirementsError(errors)
+    return RequirementsCatalog(data, mtime)
+
+
+# --- 파일 mtime 기준 캐시 ---
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def load_catalog(path='requirements.json'):
+    """파일이 바뀌었을 때만 다시 읽어 컴파일 (프로세스 전역 캐시). 파일이 없으면 빈 카탈로그"""
+    key = os.path.abspath(path)
+    try:
+        mtime = os.stat(key).st_mtime_ns
+    except FileNotFoundError:
+        return RequirementsCatalog({})
+
+    with _catalogs_lock:
+        cached = _catalogs.get(key)
+        if cached is not None and cached.mtime == mtime:
+            return cached
+        with open(key, 'r', encoding='utf-8') as f:
+            catalog = compile_requirements(json.load(f), mtime)
+        _catalogs[key] = catalog
+        return catalog
@@ -0,0 +1,190 @@
+import os
+import sys
+import threading
+import time
+
+from diagnosis import _credit, _text
+from metrics import metrics
+
+# --- 세션별 메모리 관리 ---
+# 졸업 시즌에 동시 접속이 몰리면 세션마다 들고 있는 강의 목록/진단 상태가 서버 메모리를 계속 늘립니다.
+# - CourseTable: 세션 상태에 두는 강의 목록. 행마다 dict를 만드는 대신 열(강의명/학점/이수구분) 리스트 3개로 보관합니다.
+# - SessionStore: 다시 계산할 수 있는 큰 산출물(진단 상태 등)을 세션 밖, 프로세스 전역에 보관합니다.
+#   전체 사용량이 예산을 넘으면 오래 쉬고 있는 세션의 산출물부터 버리고, 그 세션이 돌아오면 다시 계산합니다.
+#
+# 환경변수
+#   SESSION_MEMORY_BUDGET_MB=256  전역 산출물 예산
+#   SESSION_IDLE_SECONDS=300      이 시간 이상 요청이 없으면 "쉬는 세션" (예산 초과 시 먼저 정리)
+#   SESSION_TTL_SECONDS=3600      이 시간 이상 요청이 없으면 세션 기록 자체를 삭제 (브라우저를 닫은 세션)
+
+
+class CourseTable:
+    """강의 목록을 열 단위로 보관하는 가벼운 테이블 (행 dict 대신 리스트 3개)"""
+    __slots__ = ("names", "credits", "types")
+
+    def __init__(self, names=(), credits=(), types=()):
+        self.names = list(names)
+        self.credits = list(credits)
+        self.types = list(types)
+
+    @classmethod
+    def from_records(cls, records):
+        """[{"강의명", "학점", "이수구분"}, ...] → CourseTable (빈 칸/NaN은 ""/0.0)"""
+        table = cls()
+        for row in records:
+            table.append(row.get("강의명"), row.get("학점"), row.get("이수구분"))
+        return table
+
+    def append(self, name, credit, ftype):
+        # 강의명/이수구분은 세션마다 같은 문자열이 반복되므로 intern으로 한 벌만 보관
+        self.names.append(sys.intern(_text(name)))
+        self.credits.append(_credit(credit))
+        self.types.append(sys.intern(_text(ftype)))
+
+    def __len__(self):
+        return len(self.names)
+
+    def columns(self):
+        """DataFrame 생성용 {열 이름: 리스트}"""
+        return {"강의명": self.names, "학점": self.credits, "이수구분": self.types}
+
+    def nbytes(self):
+        return sum(sys.getsizeof(col) for col in (self.names, self.credits, self.types)) + 24 * len(self.credits)
+
+
+def estimate_size(obj, exclude=(), _seen=None):
+    """객체가 참조하는 메모리 대략값 (dict/list/tuple/set/__slots__/__dict__를 따라감). exclude는 공유 객체(세지 않음)"""
+    seen = _seen if _seen is not None else {id(o) for o in exclude}
+    if id(obj) in seen: return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if hasattr(obj, "nbytes") and not callable(obj.nbytes):  # numpy 배열
+        return size + int(obj.nbytes)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, _seen=seen) + estimate_size(v, _seen=seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen=seen) for item in obj)
+    else:
+        for name in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, name): size += estimate_size(getattr(obj, name), _seen=seen)
+        if hasattr(obj, "__dict__"):
+            size += estimate_size(vars(obj), _seen=seen)
+    return size
+
+
+class _Session:
+    __slots__ = ("last_seen", "artifacts")
+
+    def __init__(self):
+        self.last_seen = time.monotonic()
+        self.artifacts = {}  # 이름 → (값, 크기)
+
+
+class SessionStore:
+    """세션별 재계산 가능한 산출물 보관소 (프로세스 전역 메모리 예산 적용, 스레드 안전)"""
+
+    def __init__(self, budget_bytes, idle_seconds=300, ttl_seconds=3600):
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._used = 0
+        self.evictions = 0
+
+    def touch(self, session_id):
+        """요청이 들어올 때마다 호출: 최근 사용 시각 갱신 + 오래된 세션 정리"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session()
+            session.last_seen = now
+            self._expire(now)
+            self._publish()
+
+    def get(self, session_id, name):
+        """보관된 산출물 (없거나 정리되었으면 None → 호출한 쪽에서 다시 계산)"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None: return None
+            item = session.artifacts.get(name)
+            return item[0] if item else None
+
+    def put(self, session_id, name, value, size=None):
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session()
+            old = session.artifacts.get(name)
+            if old: self._used -= old[1]
+            session.artifacts[name] = (value, size)
+            self._used += size
+            self._enforce_budget(keep=session_id)
+            self._publish()
+
+    def drop(self, session_id, name=None):
+        """산출물 하나(name) 또는 세션 전체 삭제"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None: return
+            names = [name] if name else list(session.artifacts)
+            for n in names:
+                item = session.artifacts.pop(n, None)
+                if item: self._used -= item[1]
+            if name is None: del self._sessions[session_id]
+            self._publish()
+
+    def _expire(self, now):
+        for sid in [sid for sid, s in self._sessions.items() if now - s.last_seen > self.ttl_seconds]:
+            self._used -= sum(size for _, size in self._sessions.pop(sid).artifacts.values())
+
+    def _enforce_budget(self, keep):
+        """예산 초과 시: 쉬는 세션 → 그 외 세션 순서로, 오래 쉰 세션의 큰 산출물부터 버림 (현재 세션 제외)"""
+        if self._used <= self.budget_bytes: return
+        now = time.monotonic()
+        candidates = sorted(
+            ((now - s.last_seen < self.idle_seconds, s.last_seen, -size, sid, name)
+             for sid, s in self._sessions.items() if sid != keep
+             for name, (_, size) in s.artifacts.items()),
+        )
+        for _, _, _, sid, name in candidates:
+            if self._used <= self.budget_bytes: break
+            _, size = self._sessions[sid].artifacts.pop(name)
+            self._used -= size
+            self.evictions += 1
+            metrics.incr("session_evictions")
+
+    def _publish(self):
+        metrics.set_gauge("session_memory_bytes", self._used)
+        metrics.set_gauge("sessions_active", len(self._sessions))
+
+    def usage(self):
+        """{"used", "budget", "sessions", "idle_sessions", "evictions"}"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "used": self._used,
+                "budget": self.budget_bytes,
+                "sessions": len(self._sessions),
+                "idle_sessions": sum(1 for s in self._sessions.values() if now - s.last_seen >= self.idle_seconds),
+                "evictions": self.evictions,
+            }
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# 프로세스 전역 보관소 (Streamlit 세션들이 공유)
+session_store = SessionStore(
+    budget_bytes=_env_int("SESSION_MEMORY_BUDGET_MB", 256) * 1024 * 1024,
+    idle_seconds=_env_int("SESSION_IDLE_SECONDS", 300),
+    ttl_seconds=_env_int("SESSION_TTL_SECONDS", 3600),
+)
@@ -0,0 +1,64 @@
+"""DiagnosisState.sync()로 조금씩 고친 결과가 처음부터 다시 계산한 diagnose()와 같은지 (무작위 편집 순서)"""
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from diagnosis import DiagnosisState, diagnose  # noqa: E402
+from requirements_model import load_catalog  # noqa: E402
+
+TYPES = ["전공필수", "전공선택", "교양(리더십)", "교양(문학과예술)", "교양(인간과역사)", "교양(언어와표현)",
+         "교양(자연과우주)", "교양(정보와기술)", "교양/기타", "", None]
+CREDITS = [0, 0.5, 1, 2, 3, 3, 3, 4, None, float("nan")]
+
+
+def _pool(catalog, criteria):
+    names = [name for courses in catalog.area_courses.values() for name in courses[:5]]
+    names += list(criteria.major_required) + list(criteria.major_elective)
+    names += [kw for item in criteria.required_courses for kw in item.keywords]
+    names += ["채플", "RC리더십", "대학학문의세계", "글쓰기", "임상실습(1)", "", None]
+    return names
+
+
+def _random_row(rng, pool):
+    return {"강의명": rng.choice(pool), "학점": rng.choice(CREDITS), "이수구분": rng.choice(TYPES)}
+
+
+def _edit(rng, rows, pool):
+    """에디터에서 일어나는 편집 하나: 추가 / 삭제 / 칸 수정 / 순서 변경"""
+    rows = [dict(r) for r in rows]
+    op = rng.choice(["add", "add", "delete", "edit", "edit", "shuffle"])
+    if op == "add" or not rows:
+        rows.insert(rng.randrange(len(rows) + 1), _random_row(rng, pool))
+    elif op == "delete":
+        del rows[rng.randrange(len(rows))]
+    elif op == "edit":
+        row = rows[rng.randrange(len(rows))]
+        column = rng.choice(["강의명", "학점", "이수구분"])
+        row[column] = _random_row(rng, pool)[column]
+    else:
+        rng.shuffle(rows)
+    return rows
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog(os.path.join(ROOT, "requirements.json"))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_sync_matches_full_recomputation(catalog, seed):
+    rng = random.Random(seed)
+    criteria = rng.choice(sorted(catalog.entries.values(), key=lambda r: (r.year, r.version, r.dept)))
+    pool = _pool(catalog, criteria)
+    rows = [_random_row(rng, pool) for _ in range(rng.randint(0, 40))]
+    state = DiagnosisState(criteria).sync(rows)
+    for step in range(60):
+        rows = _edit(rng, rows, pool)
+        assert state.sync(rows).report() == diagnose(rows, criteria), f"seed={seed} step={step}"
+        # 메모는 현재 행의 키만 보관 (입력 중간 값이 쌓이지 않음)
+        assert set(state._contributions) == set(state._rows), f"seed={seed} step={step}"